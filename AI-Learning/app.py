@@ -1,14 +1,24 @@
 import os
+import logging
 from dotenv import load_dotenv
 from openai import OpenAI
 
 from utils.loaders import load_pdfs
-from utils.embedder import build_or_load_vectorstore
+from utils.embedder import build_or_load_vectorstore, get_embeddings, search_by_vectors
+from utils.ingest import IngestionPool
+from utils.context import pack_context
 from utils.prompts import get_benji_prompt
+from utils.advice import load_training_phrases_and_advices, format_advices_for_prompt
+from utils.batch import run_bounded
+from utils.resilience import ResilientChatClient
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
 client = OpenAI(api_key=openai_api_key)
+# Timeouts, retries with backoff, circuit breaking and hedging for completions
+llm = ResilientChatClient(client)
+
+logger = logging.getLogger(__name__)
 
 # Global system prompt
 SYSTEM_PROMPT = (
@@ -16,37 +26,21 @@ SYSTEM_PROMPT = (
     "Your goal is to help them get paid, not to get angry."
 )
 
+# Retrieved chunks are deduplicated and packed into at most this many prompt tokens
+CONTEXT_TOKEN_BUDGET = 2500
+
+# Shown to the user when the model can't be reached even after retries
+UNAVAILABLE_REPLY = (
+    "I'm having trouble reaching my knowledge service right now. "
+    "Your claim details are safe - please try your question again in a moment."
+)
+
 # Shared history starter
 initial_history = [
     {"role": "system", "content": SYSTEM_PROMPT}
 ]
 
 
-# --- CSV advice logic (import, format, but do NOT add to vectorstore) ---
-import pandas as pd
-from collections import defaultdict
-
-def load_training_phrases_and_advices(csv_path):
-    advices_by_category = defaultdict(list)
-    if os.path.isdir(csv_path):
-        for filename in os.listdir(csv_path):
-            if filename.endswith(".csv"):
-                df = pd.read_csv(os.path.join(csv_path, filename), encoding="utf-8")
-                for _, row in df.iterrows():
-                    category = row.get('Category', row.get('category', 'General'))
-                    advice = row.get('Advice', row.get('advice', ''))
-                    if pd.notna(category) and pd.notna(advice):
-                        advices_by_category[str(category).strip()].append(str(advice).strip())
-    return advices_by_category
-
-def format_advices_for_prompt(advices_by_category):
-    lines = ["Reference Advice (imported from CSV):"]
-    for category, advices in advices_by_category.items():
-        lines.append(f"{category}:")
-        for advice in advices:
-            lines.append(f"  - {advice}")
-    return "\n".join(lines)
-
 # Load PDFs (only PDFs go into vectorstore)
 pdf_docs = load_pdfs("data/")
 
@@ -57,6 +51,11 @@ csv_advice_reference = format_advices_for_prompt(advices_by_category)
 # Only PDF docs are stored in the global vectorstore
 document_chunks = pdf_docs
 global_vectorstore = build_or_load_vectorstore(document_chunks)  # Should return FAISS index with retriever
+embeddings = get_embeddings()
+
+# Uploaded PDFs are indexed by background workers so the first question after an upload doesn't wait on embedding
+ingestion_pool = IngestionPool()
+ingestion_pool.start()
 
 
 def create_session_history():
@@ -96,63 +95,67 @@ def get_history_text(history_list, max_tokens=2048):
         f"User: {msg['human']}\nBenji: {msg['ai']}" if 'human' in msg and 'ai' in msg else f"{msg['role']}: {msg['content']}" for msg in trimmed_history
     ])
 
-def get_benji_response(claim_no, name, phone, email, user_question, chat_history_list=None, local_folder_name="local_knowledge", local_pdf_path_or_folder="upload/"):
-    import traceback
-    try:
-        if chat_history_list is None:
-            chat_history_list = []
-        # --- Local knowledge support ---
-        # Build local vectorstore if local_pdf_path_or_folder exists and has PDFs
-        local_store_path = os.path.join("index", local_folder_name, "faiss_store")
-        local_docs = load_pdfs(local_pdf_path_or_folder)
-        if local_docs:
-            local_vectorstore = build_or_load_vectorstore(local_docs, local_store_path)
-            local_context_docs = local_vectorstore.similarity_search(user_question, k=7)
-            local_context = "\n\n".join([doc.page_content for doc in local_context_docs])
-        else:
-            local_context = ""
-        # --- Global knowledge ---
-        global_context_docs = global_vectorstore.similarity_search(user_question, k=4)
-        global_context = "\n\n".join([doc.page_content for doc in global_context_docs])
-        # --- Combine context ---
-        combined_context = f"[Local knowledge: {local_folder_name}]\n" + local_context + "\n\n[Global knowledge]\n" + global_context
-
-        # Build advice text from CSV
-        advice_text = csv_advice_reference
-
-        # System prompt instructions for Benji (from main.py)
-        system_message = (
-            "You are Benji, a calm and strategic assistant helping users through insurance claims.\n"
-            "Your personality:\n"
-            "- Calm, never emotional\n"
-            "- Strategic like a chess coach\n"
-            "- Empathetic, warm, and confident\n"
-            "Include editable templates when useful. Avoid robotic responses.\n"
-            "Give the template only when the user asks for it, otherwise provide a direct answer.\n"
-            "You strictly only answer questions related to insurance claims or claim processes."
-            "If the user greets you (e.g., 'hi', 'hello', 'good morning', 'bye') respond politely as a normal chatbot would, but remind them you can only assist with insurance-related issues. For any non-insurance topic, say: 'Sorry, I can only help with insurance claim related questions.\n"
-            "Keep responses concise and focused on the user's claim. If user asked for his informations, provide it precisely. If any information is missing, say that information is missing\n"
-            "If the user asks for summary of the conversation, provide a summary of the chat history.\n"
-            "\nBest practices and advice for insurance claims:\n" + advice_text + "\n"
-        )
-        # User prompt template
-        user_template = (
-            "Context:\n{context}\n\n"
-            "Conversation history:\n{chat_history}\n\n"
-            "User question:\n{question}\n\n"
-            "CLAIM DETAILS:\n"
-            "- Claim Number: {claim_no}\n"
-            "- Claimant Name: {name}\n"
-            "- Contact Phone: {phone}\n"
-            "- Contact Email: {email}\n\n"
-            "Answer as Benji:"
-        )
-
-        # Prepare chat history text
-        history_text = get_history_text(chat_history_list, max_tokens=2048)
-
-        # Compose the prompt
-        prompt = system_message + user_template.format(
+def retrieve_benji_context(question_vectors, local_folder_name="local_knowledge", local_pdf_path_or_folder="upload/"):
+    """
+    Retrieve and pack the context for many embedded questions at once.
+    The questions are embedded once; each store is then searched by vector.
+    """
+    # --- Local knowledge support ---
+    # Queue local_pdf_path_or_folder for background ingestion; until it is ready,
+    # only the pages indexed so far are searched (none on the very first turn)
+    local_store_path = os.path.join("index", local_folder_name, "faiss_store")
+    ingestion_pool.submit(local_pdf_path_or_folder, local_store_path)
+    local_results = ingestion_pool.search_by_vectors(local_store_path, question_vectors, k=7)
+    # --- Global knowledge ---
+    global_results = search_by_vectors(global_vectorstore, question_vectors, k=4)
+    # --- Combine context ---
+    # chunk_overlap and shared policy language repeat text across chunks; pack drops the repeats
+    return [
+        pack_context([
+            (f"[Local knowledge: {local_folder_name}]", local_context_docs),
+            ("[Global knowledge]", global_context_docs),
+        ], max_tokens=CONTEXT_TOKEN_BUDGET)
+        for local_context_docs, global_context_docs in zip(local_results, global_results)
+    ]
+
+def build_benji_messages(claim_no, name, phone, email, user_question, combined_context, chat_history_list):
+    # Build advice text from CSV
+    advice_text = csv_advice_reference
+
+    # System prompt instructions for Benji (from main.py)
+    system_message = (
+        "You are Benji, a calm and strategic assistant helping users through insurance claims.\n"
+        "Your personality:\n"
+        "- Calm, never emotional\n"
+        "- Strategic like a chess coach\n"
+        "- Empathetic, warm, and confident\n"
+        "Include editable templates when useful. Avoid robotic responses.\n"
+        "Give the template only when the user asks for it, otherwise provide a direct answer.\n"
+        "You strictly only answer questions related to insurance claims or claim processes."
+        "If the user greets you (e.g., 'hi', 'hello', 'good morning', 'bye') respond politely as a normal chatbot would, but remind them you can only assist with insurance-related issues. For any non-insurance topic, say: 'Sorry, I can only help with insurance claim related questions.\n"
+        "Keep responses concise and focused on the user's claim. If user asked for his informations, provide it precisely. If any information is missing, say that information is missing\n"
+        "If the user asks for summary of the conversation, provide a summary of the chat history.\n"
+        "\nBest practices and advice for insurance claims:\n" + advice_text + "\n"
+    )
+    # User prompt template
+    user_template = (
+        "Context:\n{context}\n\n"
+        "Conversation history:\n{chat_history}\n\n"
+        "User question:\n{question}\n\n"
+        "CLAIM DETAILS:\n"
+        "- Claim Number: {claim_no}\n"
+        "- Claimant Name: {name}\n"
+        "- Contact Phone: {phone}\n"
+        "- Contact Email: {email}\n\n"
+        "Answer as Benji:"
+    )
+
+    # Prepare chat history text
+    history_text = get_history_text(chat_history_list, max_tokens=2048)
+
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": user_template.format(
             context=combined_context,
             chat_history=history_text,
             question=user_question,
@@ -160,30 +163,75 @@ def get_benji_response(claim_no, name, phone, email, user_question, chat_history
             name=name,
             phone=phone,
             email=email
-        )
-
-        # Call OpenAI
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_template.format(
-                    context=combined_context,
-                    chat_history=history_text,
-                    question=user_question,
-                    claim_no=claim_no,
-                    name=name,
-                    phone=phone,
-                    email=email
-                )}
-            ],
-            temperature=0.3,
-            max_tokens=2048
-        )
-        reply = response.choices[0].message.content
+        )}
+    ]
+
+def complete_benji(messages):
+    # Call OpenAI
+    response = llm.create(
+        model="gpt-4o",
+        messages=messages,
+        temperature=0.3,
+        max_tokens=2048
+    )
+    return response.choices[0].message.content
+
+def get_benji_response(claim_no, name, phone, email, user_question, chat_history_list=None, local_folder_name="local_knowledge", local_pdf_path_or_folder="upload/"):
+    if chat_history_list is None:
+        chat_history_list = []
+    try:
+        question_vector = embeddings.embed_query(user_question)
+        combined_context = retrieve_benji_context([question_vector], local_folder_name, local_pdf_path_or_folder)[0]
+        messages = build_benji_messages(claim_no, name, phone, email, user_question, combined_context, chat_history_list)
+        reply = complete_benji(messages)
         chat_history_list.append({"human": user_question, "ai": reply})
         return reply, chat_history_list
+    except Exception:
+        # Details go to the log; the user gets a calm reply and the turn is not added to history
+        logger.exception("Benji failed to answer claim %s", claim_no)
+        return UNAVAILABLE_REPLY, chat_history_list
+
+def get_benji_metrics():
+    """
+    Counters and latency percentiles for the LLM client (retries, timeouts,
+    circuit state, hedges), e.g. for a Django health or metrics view.
+    """
+    return llm.metrics()
+
+def get_benji_responses(items, local_folder_name="local_knowledge", local_pdf_path_or_folder="upload/", max_concurrency=8, requests_per_minute=None):
+    """
+    Answer many questions at once, e.g. for QA replays or transcript migration.
+    items: iterable of (claim, question, history) where claim is a dict with
+    claim_no, name, phone and email (or a tuple in that order) and history is a
+    chat history list or None.
+    Returns one {"reply", "chat_history", "error"} dict per item, in order. A
+    failing item sets "error" and does not affect the others.
+    """
+    if max_concurrency > llm.max_concurrency:
+        raise ValueError(f"max_concurrency={max_concurrency} is more than the LLM client can run at once ({llm.max_concurrency})")
+    items = list(items)
+    results = [{"reply": None, "chat_history": list(history or []), "error": None} for _, _, history in items]
+    try:
+        # One embeddings call for the whole batch; the stores are searched with the vectors
+        question_vectors = embeddings.embed_documents([question for _, question, _ in items])
+        contexts = retrieve_benji_context(question_vectors, local_folder_name, local_pdf_path_or_folder)
     except Exception as e:
-        tb = traceback.format_exc()
-        error_type = type(e).__name__
-        return f"Error ({error_type}): {str(e)}\nTraceback:\n{tb}", chat_history_list
+        for result in results:
+            result["error"] = f"{type(e).__name__}: {e}"
+        return results
+
+    def answer(index):
+        claim, question, _ = items[index]
+        if isinstance(claim, dict):
+            claim = (claim.get("claim_no"), claim.get("name"), claim.get("phone"), claim.get("email"))
+        history = results[index]["chat_history"]
+        reply = complete_benji(build_benji_messages(*claim, question, contexts[index], history))
+        history.append({"human": question, "ai": reply})
+        return reply
+
+    for index, outcome in enumerate(run_bounded(answer, range(len(items)), max_concurrency, requests_per_minute)):
+        if isinstance(outcome, Exception):
+            results[index]["error"] = f"{type(outcome).__name__}: {outcome}"
+        else:
+            results[index]["reply"] = outcome
+    return results
@@ -20,10 +20,7 @@ def main():
         reply, chat_history = get_benji_response(
             claim_no, name, phone, email, user_input, chat_history, local_folder_name, local_pdf_path_or_folder
         )
-        if reply.startswith("Error"):
-            print(f"Benji: {reply} (Check your API key, vectorstore, or data files)")
-        else:
-            print(f"Benji: {reply}\n")
+        print(f"Benji: {reply}\n")
 
 if __name__ == "__main__":
     main()
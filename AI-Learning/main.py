@@ -12,6 +12,7 @@ from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableLambda
 import json
+from utils.advice import CSV_CHUNKSIZE, list_csvs, read_csv_chunks
 
 # Load PDF documents from a directory
 def load_pdfs(pdf_path_or_dir):
@@ -44,20 +45,22 @@ def load_pdfs(pdf_path_or_dir):
     return documents
 
 # Load training phrases from CSV files
-def load_training_phrases(csv_path):
+def load_training_phrases(csv_path, chunksize=CSV_CHUNKSIZE):
     documents = []
-    if os.path.isdir(csv_path):
-        for filename in os.listdir(csv_path):
-            if filename.endswith(".csv"):
-                # print(f"Loading training phrases")
-                df = pd.read_csv(os.path.join(csv_path, filename), encoding="utf-8")
-                for index, row in df.iterrows():
-                    content = " ".join(str(value) for value in row.values if pd.notna(value))
-                    # Create a Document object with metadata
-                    documents.append(Document(
-                        page_content=content,
-                        metadata={"source": filename, "type": "training_phrase", "row": index}
-                    ))
+    for path in list_csvs(csv_path):
+        filename = os.path.basename(path)
+        for chunk in read_csv_chunks(path, chunksize=chunksize):
+            # Join each row's non-empty cells column by column instead of row by row
+            content = pd.Series("", index=chunk.index, dtype="string")
+            for column in chunk.columns:
+                values = chunk[column]
+                joined = (content + " " + values).where(content != "", values)
+                content = joined.where(values.notna(), content)
+            # Create a Document object with metadata
+            documents.extend(
+                Document(page_content=text, metadata={"source": filename, "type": "training_phrase", "row": index})
+                for index, text in zip(chunk.index.tolist(), content.tolist())
+            )
     return documents
 
 # Embedder utility functions
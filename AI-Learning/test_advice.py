@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from main import load_training_phrases
+from utils.advice import load_training_phrases_and_advices
+
+
+def advices_row_by_row(csv_path):
+    # The loader as it was before chunked, vectorised reads
+    advices_by_category = {}
+    for filename in sorted(os.listdir(csv_path)):
+        if filename.endswith(".csv"):
+            df = pd.read_csv(os.path.join(csv_path, filename), encoding="utf-8")
+            for _, row in df.iterrows():
+                category = row.get('Category', row.get('category', 'General'))
+                advice = row.get('Advice', row.get('advice', ''))
+                if pd.notna(category) and pd.notna(advice):
+                    advices_by_category.setdefault(str(category).strip(), []).append(str(advice).strip())
+    return advices_by_category
+
+
+def phrases_row_by_row(csv_path):
+    documents = []
+    for filename in sorted(os.listdir(csv_path)):
+        if filename.endswith(".csv"):
+            df = pd.read_csv(os.path.join(csv_path, filename), encoding="utf-8")
+            for index, row in df.iterrows():
+                content = " ".join(str(value) for value in row.values if pd.notna(value))
+                documents.append((filename, index, content))
+    return documents
+
+
+class CsvTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        with open(os.path.join(self.dir, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+class TestLoadAdvices(CsvTestCase):
+    def test_matches_row_by_row_across_chunks_and_empty_cells(self):
+        self.write("a.csv", "Category,Advice,Note\n"
+                            "Water , Turn off the mains ,x\n"
+                            "Fire,Call the fire service,\n"
+                            ",Orphan advice,\n"
+                            "Water,,\n"
+                            "Water,Photograph the damage,y\n")
+        self.write("b.csv", "category,advice\nTheft,Report to the police\nFire,Keep receipts\n")
+        loaded = load_training_phrases_and_advices(self.dir, chunksize=2)
+        self.assertEqual(dict(loaded), advices_row_by_row(self.dir))
+        self.assertEqual(loaded["Water"], ["Turn off the mains", "Photograph the damage"])
+
+    def test_missing_columns(self):
+        self.write("no_category.csv", "Advice\nKeep receipts\n")
+        self.write("no_advice.csv", "Category,Note\nFire,unused\n")
+        self.assertEqual(dict(load_training_phrases_and_advices(self.dir, chunksize=1)), {"General": ["Keep receipts"]})
+
+
+class TestLoadTrainingPhrases(CsvTestCase):
+    def test_matches_row_by_row_across_chunks_and_empty_cells(self):
+        self.write("phrases.csv", "Intent,Phrase,Extra\n"
+                                  "greeting,Hello there,\n"
+                                  ",How do I claim?,claims\n"
+                                  "farewell,,\n"
+                                  ",,\n"
+                                  "status,Where is my claim,tracking\n")
+        documents = load_training_phrases(self.dir, chunksize=2)
+        self.assertEqual(
+            [(doc.metadata["source"], doc.metadata["row"], doc.page_content) for doc in documents],
+            phrases_row_by_row(self.dir),
+        )
+        self.assertEqual(documents[1].page_content, "How do I claim? claims")
+        self.assertEqual(documents[3].page_content, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import threading
+import time
+import unittest
+
+from utils.batch import RateLimiter, run_bounded
+
+
+class TestRunBounded(unittest.TestCase):
+    def test_results_keep_item_order_and_errors_stay_on_their_item(self):
+        def answer(item):
+            if item == 2:
+                raise ValueError("bad question")
+            time.sleep(0.01 * (5 - item))
+            return item * 10
+
+        results = run_bounded(answer, range(5), max_concurrency=5)
+        self.assertEqual([results[i] for i in (0, 1, 3, 4)], [0, 10, 30, 40])
+        self.assertIsInstance(results[2], ValueError)
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        in_flight, peak = 0, 0
+
+        def answer(item):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return item
+
+        run_bounded(answer, range(12), max_concurrency=3)
+        self.assertEqual(peak, 3)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_call_starts_are_spaced_out(self):
+        limiter = RateLimiter(requests_per_minute=1200)  # one start every 50 ms
+        started = time.monotonic()
+        for _ in range(4):
+            limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+from types import SimpleNamespace
+
+from utils.context import count_tokens, pack_context
+
+
+def doc(text):
+    return SimpleNamespace(page_content=text)
+
+
+class TestPackContext(unittest.TestCase):
+    def test_overlapping_chunks_are_deduplicated(self):
+        first = "Water damage is covered.\nFire damage is covered up to $5,000."
+        second = "Fire damage is covered up to $5,000. Claims must be filed within 30 days."
+        packed = pack_context([("[Local]", [doc(first), doc(second)]), ("[Global]", [doc(first)])])
+        self.assertEqual(packed.count("Fire damage is covered"), 1)
+        self.assertIn("Claims must be filed within 30 days.", packed)
+        self.assertTrue(packed.startswith("[Local]\n"))
+        self.assertIn("\n\n[Global]\n", packed)
+
+    def test_respects_token_budget(self):
+        docs = [doc(f"Clause {i}: the insurer pays for damage of type {i} after inspection.") for i in range(20)]
+        packed = pack_context([("[Global]", docs)], max_tokens=40)
+        self.assertLessEqual(count_tokens(packed), 40)
+        self.assertIn("Clause 0", packed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from utils.ingest import FileQueue, IngestionPool
+
+
+class TestFileQueueRecovery(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.queue = FileQueue(self.root.name, lease_seconds=60)
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def claim(self, owner=None):
+        self.queue.put({"source": "a.pdf", "store_path": "a"})
+        job_id, job = self.queue.get()
+        if owner is not None:
+            path = os.path.join(self.queue.working_dir, job_id + ".json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({**job, "owner": owner}, f)
+        return job_id
+
+    def test_live_jobs_stay_claimed(self):
+        job_id = self.claim()
+        self.assertEqual(self.queue.requeue_unfinished(), [])
+        self.assertTrue(os.path.exists(os.path.join(self.queue.working_dir, job_id + ".json")))
+
+    def test_dead_owner_is_recovered(self):
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        job_id = self.claim(owner=process.pid)
+        self.assertEqual(self.queue.requeue_unfinished(), [job_id])
+        self.assertEqual(self.queue.get()[0], job_id)
+
+    def test_expired_lease_is_recovered(self):
+        job_id = self.claim()
+        old = time.time() - 120
+        os.utime(os.path.join(self.queue.working_dir, job_id + ".json"), (old, old))
+        self.assertEqual(self.queue.requeue_unfinished(), [job_id])
+
+
+class TestIngestionRetries(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.pdf = os.path.join(self.root.name, "policy.pdf")
+        open(self.pdf, "wb").close()
+        self.store = os.path.join(self.root.name, "store")
+        self.pool = IngestionPool(queue=FileQueue(os.path.join(self.root.name, "queue")), max_attempts=2)
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def test_failed_upload_is_retried_until_the_limit(self):
+        self.pool._write_status(self.store, "failed", attempts=1)
+        self.assertEqual(self.pool.submit(self.pdf, self.store), "queued")
+        self.assertEqual(self.pool.queue.get()[1]["attempt"], 2)
+
+        self.pool._write_status(self.store, "failed", attempts=2)
+        self.assertEqual(self.pool.submit(self.pdf, self.store), "failed")
+        self.assertIsNone(self.pool.queue.get())
+
+    def test_orphaned_status_is_requeued(self):
+        self.pool._write_status(self.store, "indexing", pages_indexed=0, pages_total=3)
+        self.assertEqual(self.pool.submit(self.pdf, self.store), "queued")
+        self.assertEqual(self.pool.queue.get()[1]["store_path"], self.store)
+
+    def test_queued_job_is_not_submitted_twice(self):
+        self.assertEqual(self.pool.submit(self.pdf, self.store), "queued")
+        self.assertEqual(self.pool.submit(self.pdf, self.store), "queued")
+        self.assertEqual(len(list(self.pool.queue.jobs())), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+from utils.resilience import CircuitBreaker, ResilientChatClient
+
+
+class FlakyClient:
+    """Stands in for the OpenAI client; fails the first `failures` calls."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def with_options(self, **options):
+        return self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+        return "ok"
+
+
+class TestBreakerThreshold(unittest.TestCase):
+    def test_one_exhausted_call_counts_as_one_failure(self):
+        breaker = CircuitBreaker(failure_threshold=5)
+        client = ResilientChatClient(FlakyClient(failures=100), max_retries=4, base_delay=0, breaker=breaker)
+        with self.assertRaises(openai.APIConnectionError):
+            client.create(model="gpt-4o", messages=[])
+        self.assertEqual(client._client.calls, 5)
+        self.assertEqual(breaker.state, "closed")
+
+    def test_breaker_opens_after_threshold_calls(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        client = ResilientChatClient(FlakyClient(failures=100), max_retries=1, base_delay=0, breaker=breaker)
+        for _ in range(2):
+            with self.assertRaises(openai.APIConnectionError):
+                client.create(model="gpt-4o", messages=[])
+        self.assertEqual(breaker.state, "open")
+
+    def test_retry_after_is_capped(self):
+        client = ResilientChatClient(FlakyClient(failures=0), max_delay=2.0)
+        response = httpx.Response(429, headers={"retry-after": "600"}, request=httpx.Request("POST", "https://api.openai.com"))
+        error = openai.RateLimitError("slow down", response=response, body=None)
+        self.assertLessEqual(client._backoff(0, error), 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
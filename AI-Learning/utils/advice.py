@@ -2,17 +2,42 @@ import os
 import pandas as pd
 from collections import defaultdict
 
-def load_training_phrases_and_advices(csv_path):
-    advices_by_category = defaultdict(list)
+# Rows are read this many at a time so large sheets never sit in memory as one DataFrame
+CSV_CHUNKSIZE = 100_000
+
+def list_csvs(csv_path):
     if os.path.isdir(csv_path):
-        for filename in os.listdir(csv_path):
-            if filename.endswith(".csv"):
-                df = pd.read_csv(os.path.join(csv_path, filename), encoding="utf-8")
-                for _, row in df.iterrows():
-                    category = row.get('Category', row.get('category', 'General'))
-                    advice = row.get('Advice', row.get('advice', ''))
-                    if pd.notna(category) and pd.notna(advice):
-                        advices_by_category[str(category).strip()].append(str(advice).strip())
+        return [os.path.join(csv_path, filename) for filename in sorted(os.listdir(csv_path)) if filename.endswith(".csv")]
+    return []
+
+def read_csv_chunks(path, usecols=None, chunksize=CSV_CHUNKSIZE):
+    """
+    Stream a CSV as DataFrame chunks with every column read as a nullable string.
+    """
+    return pd.read_csv(path, encoding="utf-8", usecols=usecols, dtype="string", chunksize=chunksize)
+
+def _pick_column(columns, *names):
+    for name in names:
+        if name in columns:
+            return name
+    return None
+
+def load_training_phrases_and_advices(csv_path, chunksize=CSV_CHUNKSIZE):
+    advices_by_category = defaultdict(list)
+    for path in list_csvs(csv_path):
+        columns = pd.read_csv(path, encoding="utf-8", nrows=0).columns
+        category_column = _pick_column(columns, "Category", "category")
+        advice_column = _pick_column(columns, "Advice", "advice")
+        if advice_column is None:
+            continue
+        usecols = [column for column in (category_column, advice_column) if column is not None]
+        for chunk in read_csv_chunks(path, usecols=usecols, chunksize=chunksize):
+            advice = chunk[advice_column]
+            category = chunk[category_column] if category_column else pd.Series("General", index=chunk.index, dtype="string")
+            rows = pd.DataFrame({"category": category.str.strip(), "advice": advice.str.strip()}).dropna()
+            # groupby keeps first-seen category order and row order within each category
+            for name, advices in rows.groupby("category", sort=False)["advice"]:
+                advices_by_category[name].extend(advices.tolist())
     return advices_by_category
 
 def format_advices_for_prompt(advices_by_category):
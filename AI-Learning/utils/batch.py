@@ -0,0 +1,42 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RateLimiter:
+    """
+    Spaces out call starts so a batch stays under the provider's requests-per-minute limit.
+    """
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute
+        self._next_start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def run_bounded(fn, items, max_concurrency=8, requests_per_minute=None):
+    """
+    Call fn on every item with at most max_concurrency calls in flight.
+    Returns results in item order; an exception raised for one item is
+    returned in its place instead of being raised.
+    """
+    limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+
+    def call(item):
+        if limiter is not None:
+            limiter.wait()
+        try:
+            return fn(item)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        return list(executor.map(call, items))
@@ -0,0 +1,122 @@
+import re
+
+from utils.history import estimate_token_count
+
+_encoding = None
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")  # gpt-4o tokenizer
+        except Exception:
+            _encoding = False  # Fall back to the 4-chars-per-token estimate
+    return _encoding
+
+def count_tokens(text):
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    return estimate_token_count(text)
+
+def truncate_to_tokens(text, max_tokens):
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding:
+        return encoding.decode(encoding.encode(text)[:max_tokens])
+    return text[:max_tokens * 4]
+
+def _split_spans(text):
+    # Sentences and lines are the unit of deduplication; chunk_overlap repeats whole ones.
+    # Returns (span, separator) pairs so kept spans can be re-joined with their original layout.
+    parts = re.split(r"((?<=[.!?])[ \t]+|\s*\n\s*)", text)
+    parts.append("")
+    return [(parts[i], parts[i + 1]) for i in range(0, len(parts) - 1, 2) if parts[i].strip()]
+
+def _normalise(span):
+    return " ".join(re.sub(r"[^\w\s]", " ", span.lower()).split())
+
+def _shingles(text, n=3):
+    words = _normalise(text).split()
+    if len(words) < n:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+def _similarity(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def mmr_order(candidates, lambda_mult=0.7, duplicate_threshold=0.9):
+    """
+    Order (relevance, text) candidates by maximal marginal relevance, using
+    word-trigram overlap as the redundancy measure. Near-duplicates are dropped.
+    Returns indices into candidates.
+    """
+    shingles = [_shingles(text) for _, text in candidates]
+    remaining = list(range(len(candidates)))
+    selected = []
+    while remaining:
+        best, best_score = None, None
+        for i in list(remaining):
+            redundancy = max((_similarity(shingles[i], shingles[j]) for j in selected), default=0.0)
+            if redundancy >= duplicate_threshold:
+                remaining.remove(i)
+                continue
+            score = lambda_mult * candidates[i][0] - (1 - lambda_mult) * redundancy
+            if best_score is None or score > best_score:
+                best, best_score = i, score
+        if best is None:
+            break
+        selected.append(best)
+        remaining.remove(best)
+    return selected
+
+def pack_context(sections, max_tokens=2500, lambda_mult=0.7):
+    """
+    Build the prompt context from retrieved chunks.
+    sections: list of (heading, docs) with docs in retrieval order.
+    Spans already included are removed, chunks are picked by MMR across all
+    sections, and the result is filled to at most max_tokens tokens.
+    """
+    candidates = []
+    for section_index, (_, docs) in enumerate(sections):
+        for rank, doc in enumerate(docs):
+            relevance = 1.0 - rank / max(len(docs), 1)
+            candidates.append((relevance, doc.page_content, section_index))
+
+    picked = [[] for _ in sections]
+
+    def render():
+        return "\n\n".join(
+            heading + "\n" + "\n\n".join(picked[i]) for i, (heading, _) in enumerate(sections)
+        )
+
+    seen_spans = set()
+    for i in mmr_order([(relevance, text) for relevance, text, _ in candidates], lambda_mult):
+        _, text, section_index = candidates[i]
+        chunk = ""
+        for span, separator in _split_spans(text):
+            key = _normalise(span)
+            if key and key not in seen_spans:
+                seen_spans.add(key)
+                chunk += span + separator
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        picked[section_index].append(chunk)
+        if count_tokens(render()) <= max_tokens:
+            continue
+        # Over budget: cut this chunk down to exactly what still fits, then stop
+        picked[section_index].pop()
+        remaining = max_tokens - count_tokens(render())
+        while remaining > 0:
+            picked[section_index].append(truncate_to_tokens(chunk, remaining))
+            if count_tokens(render()) <= max_tokens:
+                break
+            picked[section_index].pop()
+            remaining -= 1
+        break
+    return render()
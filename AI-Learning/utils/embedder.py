@@ -3,6 +3,9 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+def get_embeddings():
+    return OpenAIEmbeddings(api_key=os.getenv("OPENAI_API_KEY"), model="text-embedding-3-small")
+
 def chunk_docs(documents):
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=1000,
@@ -12,10 +15,23 @@ def chunk_docs(documents):
     return splitter.split_documents(documents)
 
 def build_or_load_vectorstore(documents, index_path="index/faiss_store"):
-    embeddings = OpenAIEmbeddings(api_key=os.getenv("OPENAI_API_KEY"), model="text-embedding-3-small")
+    embeddings = get_embeddings()
     if os.path.exists(index_path):
         return FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
     chunks = chunk_docs(documents)
     vectorstore = FAISS.from_documents(chunks, embeddings)
     vectorstore.save_local(index_path)
-    return vectorstore
\ No newline at end of file
+    return vectorstore
+
+
+def search_by_vectors(vectorstore, vectors, k=4):
+    """
+    Search a FAISS store for many already-embedded queries, without another
+    embeddings call. Returns a list of Documents per query vector.
+    """
+    if vectorstore is None:
+        return [[] for _ in vectors]
+    return [
+        [doc for doc, _ in vectorstore.similarity_search_with_score_by_vector(list(vector), k=k)]
+        for vector in vectors
+    ]
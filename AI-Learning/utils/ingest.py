@@ -0,0 +1,279 @@
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+
+from langchain_community.vectorstores import FAISS
+
+from utils.embedder import chunk_docs, get_embeddings, search_by_vectors
+from utils.loaders import iter_pdf_pages, list_pdfs
+
+
+class FileQueue:
+    """
+    Local job queue backed by one JSON file per job.
+    Workers claim a job by renaming it from pending/ to working/, so several
+    threads or processes can share the same directory. A claimed job carries
+    the owner's PID, and its file's mtime is a lease the worker renews while
+    it runs; only jobs whose owner is gone or whose lease expired are recovered.
+    """
+
+    def __init__(self, root="index/ingest_queue", lease_seconds=300):
+        self.lease_seconds = lease_seconds
+        self.pending_dir = os.path.join(root, "pending")
+        self.working_dir = os.path.join(root, "working")
+        os.makedirs(self.pending_dir, exist_ok=True)
+        os.makedirs(self.working_dir, exist_ok=True)
+
+    def put(self, job):
+        job_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+        tmp_path = os.path.join(self.pending_dir, job_id + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, os.path.join(self.pending_dir, job_id + ".json"))
+        return job_id
+
+    def get(self):
+        for name in sorted(os.listdir(self.pending_dir)):
+            if not name.endswith(".json"):
+                continue
+            working_path = os.path.join(self.working_dir, name)
+            try:
+                os.replace(os.path.join(self.pending_dir, name), working_path)
+            except FileNotFoundError:
+                continue  # Claimed by another worker
+            with open(working_path, "r", encoding="utf-8") as f:
+                job = json.load(f)
+            job["owner"] = os.getpid()
+            with open(working_path, "w", encoding="utf-8") as f:
+                json.dump(job, f)
+            return name[:-len(".json")], job
+        return None
+
+    def jobs(self):
+        """
+        Every job still pending or claimed. pending/ is listed first, so a job
+        claimed meanwhile is seen in working/.
+        """
+        for directory in (self.pending_dir, self.working_dir):
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                        yield json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    continue  # Finished, or being rewritten by get
+
+    def renew(self, job_id):
+        """
+        Extend the lease on a claimed job.
+        """
+        try:
+            os.utime(os.path.join(self.working_dir, job_id + ".json"))
+        except FileNotFoundError:
+            pass
+
+    def done(self, job_id):
+        path = os.path.join(self.working_dir, job_id + ".json")
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _is_stale(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                owner = json.load(f).get("owner")
+            leased_at = os.path.getmtime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False  # Being claimed or rewritten right now
+        if time.time() - leased_at > self.lease_seconds:
+            return True
+        if owner is None or owner == os.getpid():
+            return False
+        try:
+            os.kill(owner, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass  # Alive, but another user's process
+        return False
+
+    def requeue_unfinished(self):
+        """
+        Move jobs whose worker died mid-ingest back to pending/. Returns their ids.
+        """
+        requeued = []
+        for name in os.listdir(self.working_dir):
+            path = os.path.join(self.working_dir, name)
+            if name.endswith(".json") and self._is_stale(path):
+                try:
+                    os.replace(path, os.path.join(self.pending_dir, name))
+                except FileNotFoundError:
+                    continue  # Finished or recovered meanwhile
+                requeued.append(name[:-len(".json")])
+        return requeued
+
+
+class IngestionPool:
+    """
+    Background workers that index uploaded PDFs into a FAISS store a few pages
+    at a time. Partially indexed stores are searchable while ingestion runs,
+    and `<store_path>.status.json` publishes the state: queued, indexing, ready
+    or failed. A failed upload is retried on later submits up to max_attempts times.
+    """
+
+    def __init__(self, queue=None, workers=2, pages_per_batch=8, poll_interval=0.5, max_attempts=3):
+        self.queue = queue or FileQueue()
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.pages_per_batch = pages_per_batch
+        self.poll_interval = poll_interval
+        self._embeddings = None
+        self._stores = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = get_embeddings()
+        return self._embeddings
+
+    def start(self, recover=True):
+        if recover:
+            self.queue.requeue_unfinished()
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"benji-ingest-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    # --- Ready state ---
+    def _status_path(self, store_path):
+        return f"{store_path}.status.json"
+
+    def _write_status(self, store_path, state, **extra):
+        os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+        tmp_path = self._status_path(store_path) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"state": state, "updated_at": time.time(), **extra}, f)
+        os.replace(tmp_path, self._status_path(store_path))
+
+    def status(self, store_path):
+        status_path = self._status_path(store_path)
+        if os.path.exists(status_path):
+            with open(status_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        if os.path.exists(store_path):
+            # Index built before background ingestion existed
+            return {"state": "ready"}
+        return {"state": "missing"}
+
+    def is_ready(self, store_path):
+        return self.status(store_path)["state"] == "ready"
+
+    def submit(self, pdf_path_or_dir, store_path):
+        """
+        Queue an upload for ingestion unless it is already queued, indexing or
+        ready. A queued or indexing status whose job is gone (e.g. the job file
+        was lost in a crash) is queued again. Returns the current state.
+        """
+        with self._lock:
+            status = self.status(store_path)
+            state = status["state"]
+            if state in ("queued", "indexing"):
+                if any(job.get("store_path") == store_path for job in self.queue.jobs()):
+                    return state
+                # Read again: the job may have finished between the two reads
+                status = self.status(store_path)
+                state = status["state"]
+            if state == "ready":
+                return state
+            attempts = status.get("attempts", 1) if state == "failed" else 0
+            if attempts >= self.max_attempts:
+                return "failed"
+            if not list_pdfs(pdf_path_or_dir):
+                return "missing"
+            self._write_status(store_path, "queued")
+            self.queue.put({"source": pdf_path_or_dir, "store_path": store_path, "attempt": attempts + 1})
+        self._wake.set()
+        return "queued"
+
+    # --- Search ---
+    def get_store(self, store_path):
+        with self._lock:
+            store = self._stores.get(store_path)
+            if store is None and self.status(store_path)["state"] == "ready" and os.path.exists(store_path):
+                store = FAISS.load_local(store_path, self.embeddings, allow_dangerous_deserialization=True)
+                self._stores[store_path] = store
+            return store
+
+    def similarity_search(self, store_path, query, k=4):
+        """
+        Search whatever pages of the upload are indexed so far; empty until the first batch lands.
+        """
+        return self.search_by_vectors(store_path, [self.embeddings.embed_query(query)], k=k)[0]
+
+    def search_by_vectors(self, store_path, vectors, k=4):
+        store = self.get_store(store_path)
+        with self._lock:
+            return search_by_vectors(store, vectors, k=k)
+
+    # --- Workers ---
+    def _run(self):
+        while not self._stop.is_set():
+            claimed = self.queue.get()
+            if claimed is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            job_id, job = claimed
+            try:
+                self._ingest(job["source"], job["store_path"], renew=lambda: self.queue.renew(job_id))
+            except Exception as e:
+                self._write_status(
+                    job["store_path"], "failed", attempts=job.get("attempt", 1),
+                    error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc(),
+                )
+            finally:
+                self.queue.done(job_id)
+
+    def _ingest(self, pdf_path_or_dir, store_path, renew=None):
+        # A retry starts from an empty store, not on top of a failed attempt's chunks
+        with self._lock:
+            self._stores.pop(store_path, None)
+        pages = list(iter_pdf_pages(pdf_path_or_dir))
+        total = len(pages)
+        self._write_status(store_path, "indexing", pages_indexed=0, pages_total=total)
+        # Embed outside the lock so searches are never blocked on the embeddings API
+        for start in range(0, total, self.pages_per_batch):
+            chunks = chunk_docs(pages[start:start + self.pages_per_batch])
+            if chunks:
+                texts = [chunk.page_content for chunk in chunks]
+                metadatas = [chunk.metadata for chunk in chunks]
+                vectors = self.embeddings.embed_documents(texts)
+                with self._lock:
+                    store = self._stores.get(store_path)
+                    if store is None:
+                        self._stores[store_path] = FAISS.from_embeddings(list(zip(texts, vectors)), self.embeddings, metadatas=metadatas)
+                    else:
+                        store.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas)
+            self._write_status(store_path, "indexing", pages_indexed=min(start + self.pages_per_batch, total), pages_total=total)
+            if renew is not None:
+                renew()
+        with self._lock:
+            store = self._stores.get(store_path)
+            if store is not None:
+                store.save_local(store_path)
+            self._write_status(store_path, "ready", pages_indexed=total, pages_total=total)
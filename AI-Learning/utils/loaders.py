@@ -2,31 +2,40 @@ import os
 import pymupdf
 from langchain.schema import Document
 
+def list_pdfs(pdf_path_or_dir):
+    if os.path.isdir(pdf_path_or_dir):
+        return [
+            os.path.join(pdf_path_or_dir, filename)
+            for filename in sorted(os.listdir(pdf_path_or_dir))
+            if filename.endswith(".pdf")
+        ]
+    if os.path.isfile(pdf_path_or_dir) and pdf_path_or_dir.endswith(".pdf"):
+        return [pdf_path_or_dir]
+    return []
+
 def load_pdfs(pdf_path_or_dir):
     documents = []
-    if os.path.isdir(pdf_path_or_dir):
-        for filename in os.listdir(pdf_path_or_dir):
-            if filename.endswith(".pdf"):
-                pdf_path = os.path.join(pdf_path_or_dir, filename)
-                doc = pymupdf.open(pdf_path)
-                pages = ""
-                for page in doc:
-                    text = page.get_text()
-                    pages += str(text)
-                documents.append(Document(
-                    page_content=pages,
-                    metadata={"source": filename, "type": "pdf"}
-                ))
-                doc.close()
-    elif os.path.isfile(pdf_path_or_dir) and pdf_path_or_dir.endswith(".pdf"):
-        doc = pymupdf.open(pdf_path_or_dir)
+    for pdf_path in list_pdfs(pdf_path_or_dir):
+        doc = pymupdf.open(pdf_path)
         pages = ""
         for page in doc:
             text = page.get_text()
             pages += str(text)
         documents.append(Document(
             page_content=pages,
-            metadata={"source": os.path.basename(pdf_path_or_dir), "type": "pdf"}
+            metadata={"source": os.path.basename(pdf_path), "type": "pdf"}
         ))
         doc.close()
     return documents
+
+def iter_pdf_pages(pdf_path_or_dir):
+    """
+    Yield one Document per PDF page so callers can index a file incrementally.
+    """
+    for pdf_path in list_pdfs(pdf_path_or_dir):
+        with pymupdf.open(pdf_path) as doc:
+            for page in doc:
+                yield Document(
+                    page_content=page.get_text(),
+                    metadata={"source": os.path.basename(pdf_path), "type": "pdf", "page": page.number}
+                )
@@ -0,0 +1,206 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import openai
+
+# Transient provider errors worth retrying: 429, 5xx, timeouts and dropped connections
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive transient failures and rejects
+    calls for reset_timeout seconds, then lets a single trial call through
+    (half-open) to decide whether to close again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+class ResilientChatClient:
+    """
+    Wraps client.chat.completions.create with a per-call timeout, jittered
+    exponential backoff on transient errors, a circuit breaker and hedged
+    requests: if a call is slower than the recent hedge_percentile latency, a
+    duplicate is sent and whichever answers first wins.
+    """
+
+    def __init__(self, client, timeout=60.0, max_retries=4, base_delay=0.5, max_delay=8.0,
+                 hedge_percentile=0.95, hedge_min_samples=20, breaker=None, max_workers=32):
+        # The SDK's own retries are disabled so this policy is the only one in effect
+        self._client = client.with_options(timeout=timeout, max_retries=0)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="benji-llm")
+        self._latencies = deque(maxlen=200)
+        self._counters = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "rate_limited": 0,
+            "circuit_rejections": 0,
+            "hedges_sent": 0,
+            "hedges_won": 0,
+        }
+        self._lock = threading.Lock()
+
+    @property
+    def max_concurrency(self):
+        """
+        Calls that can be in flight at once; a hedged call holds two workers.
+        """
+        return self.max_workers // 2
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def metrics(self):
+        with self._lock:
+            snapshot = dict(self._counters)
+            latencies = sorted(self._latencies)
+        snapshot["circuit_state"] = self.breaker.state
+        snapshot["latency_p50"] = _percentile(latencies, 0.5)
+        snapshot["latency_p95"] = _percentile(latencies, 0.95)
+        snapshot["hedge_delay"] = self._hedge_delay()
+        return snapshot
+
+    def create(self, **kwargs):
+        self._count("calls")
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self._count("circuit_rejections")
+                self._count("failures")
+                raise CircuitOpenError("LLM provider circuit is open; not sending request")
+            try:
+                response = self._hedged(kwargs)
+            except RETRYABLE_ERRORS as e:
+                if isinstance(e, openai.APITimeoutError):
+                    self._count("timeouts")
+                if isinstance(e, openai.RateLimitError):
+                    self._count("rate_limited")
+                # One failure per logical call, once its retries are spent; a failed half-open trial reopens at once
+                if attempt == self.max_retries or self.breaker.state == "half_open":
+                    self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(self._backoff(attempt, e))
+                continue
+            except Exception:
+                # Bad requests and auth errors mean the provider answered; don't trip the breaker
+                self.breaker.record_success()
+                self._count("failures")
+                raise
+            self.breaker.record_success()
+            self._count("successes")
+            return response
+
+    def _backoff(self, attempt, error):
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                pass
+        # Full jitter keeps concurrent callers from retrying in lockstep
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is None:
+            return delay
+        return max(delay, min(retry_after, self.max_delay))
+
+    def _hedge_delay(self):
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        return _percentile(latencies, self.hedge_percentile)
+
+    def _call(self, kwargs):
+        start = time.monotonic()
+        response = self._client.chat.completions.create(**kwargs)
+        with self._lock:
+            self._latencies.append(time.monotonic() - start)
+        return response
+
+    def _hedged(self, kwargs):
+        primary = self._executor.submit(self._call, kwargs)
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is None:
+            return primary.result()
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done:
+            return primary.result()
+        self._count("hedges_sent")
+        hedge = self._executor.submit(self._call, kwargs)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedges_won")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
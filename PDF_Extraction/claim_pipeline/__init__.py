@@ -0,0 +1,11 @@
+"""
+Insurance claim analysis from a policy PDF and a receipt PDF.
+
+This package is the only implementation of the pipeline; main.py and app.py
+in the project root just import from here.
+"""
+from .app import amain, astream_claim_report, claim_inputs, main
+from .model import claim_analysis_chain, clause_extraction_chain, coverage_digest_chain, get_llm, model_init
+from .pdf_loader import extract_pages, iter_pdf_pages, load_pdf
+from .policy_cache import get_coverage_digest, load_pdf_cached
+from .receipt_parser import extract_receipt, financial_summary
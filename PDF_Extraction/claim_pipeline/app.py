@@ -0,0 +1,68 @@
+from .model import claim_analysis_chain
+from .map_reduce import MAP_REDUCE_THRESHOLD, reduce_policy
+from .policy_cache import aget_coverage_digest, load_pdf_cached
+from .receipt_parser import receipt_for_prompt
+from .report_stream import SectionSplitter
+import asyncio
+from functools import partial
+
+def _receipt_input(pdf2: str, list_item: list[str], selection: dict | None = None):
+    pages = (selection or {}).get("pages")
+    max_pages = max(pages) + 1 if pages else None
+    return receipt_for_prompt(pdf2, list_item, load_pdf_cached(pdf2, selection=selection), max_pages)
+
+async def claim_inputs(claim_no: int, list_item: list[str], name: str, phone: str, email: str, pdf1: str = "pdf1.pdf", pdf2: str = "pdf2.pdf", use_digest: bool = True, executor=None,
+                       policy_selection: dict | None = None, receipt_selection: dict | None = None):
+    # Load and summarize policy document
+    # Receipt line items are read locally; only the rows and exact totals go to the model
+    # Both documents are read in full unless a selection (e.g. pdf_loader.POLICY_SELECTION) narrows them
+    # PDF parsing and hashing run in executor (default: the loop's thread pool) so the event loop keeps serving other claims
+    loop = asyncio.get_running_loop()
+    receipt = await loop.run_in_executor(executor, _receipt_input, pdf2, list_item, receipt_selection)
+    if use_digest:
+        # Every claim against the same policy file shares one cached coverage digest
+        policy = "Coverage digest of the policy:\n\n" + await aget_coverage_digest(pdf1, selection=policy_selection, executor=executor)
+    else:
+        policy = await loop.run_in_executor(executor, partial(load_pdf_cached, pdf1, selection=policy_selection))
+        # Long policies are reduced to their relevant clauses section by section first
+        if len(policy) > MAP_REDUCE_THRESHOLD:
+            policy = await reduce_policy(policy, list_item)
+    return {
+        "claim_no": claim_no,
+        "name": name,
+        "phone": phone,
+        "email": email,
+        "list_item": list_item,
+        "policy": policy,
+        "receipt": receipt
+    }
+
+async def amain(claim_no: int, list_item: list[str], name: str, phone: str, email: str, pdf1: str = "pdf1.pdf", pdf2: str = "pdf2.pdf", use_digest: bool = True, executor=None,
+                policy_selection: dict | None = None, receipt_selection: dict | None = None):
+    inputs = await claim_inputs(claim_no, list_item, name, phone, email, pdf1, pdf2, use_digest, executor, policy_selection, receipt_selection)
+    # Generate final claim analysis report
+    return await claim_analysis_chain().ainvoke(inputs)
+
+async def astream_claim_report(claim_no: int, list_item: list[str], name: str, phone: str, email: str, pdf1: str = "pdf1.pdf", pdf2: str = "pdf2.pdf", use_digest: bool = True, executor=None,
+                               policy_selection: dict | None = None, receipt_selection: dict | None = None):
+    """
+    Stream the claim analysis report as events so a UI can render the
+    Executive Summary while later sections are still generating:
+    {"type": "section", "section": name} at each report section,
+    {"type": "token", "section": name, "text": ...} for content, and finally
+    {"type": "done", "report": full_text}.
+    """
+    inputs = await claim_inputs(claim_no, list_item, name, phone, email, pdf1, pdf2, use_digest, executor, policy_selection, receipt_selection)
+    splitter = SectionSplitter()
+    report = []
+    async for text in claim_analysis_chain().astream(inputs):
+        report.append(text)
+        for event in splitter.feed(text):
+            yield event
+    for event in splitter.close():
+        yield event
+    yield {"type": "done", "report": "".join(report)}
+
+def main(claim_no: int, list_item: list[str], name: str, phone: str, email: str, pdf1: str = "pdf1.pdf", pdf2: str = "pdf2.pdf", use_digest: bool = True,
+         policy_selection: dict | None = None, receipt_selection: dict | None = None):
+    return asyncio.run(amain(claim_no, list_item, name, phone, email, pdf1, pdf2, use_digest, None, policy_selection, receipt_selection))
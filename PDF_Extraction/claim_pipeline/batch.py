@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from .app import amain
+from .ocr import ocr_available, ocr_page
+from .pdf_loader import POLICY_SELECTION, RECEIPT_SELECTION, apply_ocr, extract_pages, warn_unread
+from .policy_cache import aget_coverage_digest, cached_text, file_hash, selection_key, store_text
+
+logger = logging.getLogger(__name__)
+
+def _parse_items(value):
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    value = (value or "").strip()
+    if value.startswith("["):
+        return [str(item) for item in json.loads(value)]
+    return [item.strip() for item in value.split(";") if item.strip()]
+
+def _normalise_claim(row: dict):
+    return {
+        "claim_no": str(row["claim_no"]),
+        "list_item": _parse_items(row.get("items", row.get("list_item"))),
+        "name": row.get("claimant", row.get("name", "")),
+        "phone": row.get("phone", ""),
+        "email": row.get("email", ""),
+        "policy": row.get("policy", row.get("policy_path")),
+        "receipt": row.get("receipt", row.get("receipt_path"))
+    }
+
+def read_manifest(path: str):
+    """
+    Read claims from a CSV or JSONL manifest with claim_no, items, claimant,
+    policy and receipt (phone and email optional). In CSV, items are separated
+    by ";" or given as a JSON array.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    return [_normalise_claim(row) for row in rows]
+
+def completed_claims(output_path: str):
+    """
+    Claim numbers already written successfully, so a rerun after a crash resumes where it stopped.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial last line from a crash
+            if record.get("status") == "ok":
+                done.add(str(record["claim_no"]))
+    return done
+
+async def run_batch(manifest_path: str, output_path: str = "results.jsonl", extract_workers: int | None = None, max_concurrency: int = 8, use_digest: bool = True,
+                    policy_selection: dict | None = None, receipt_selection: dict | None = None):
+    claims = read_manifest(manifest_path)
+    done = completed_claims(output_path)
+    pending = [claim for claim in claims if claim["claim_no"] not in done]
+    logger.info("%d claims to process (%d already done)", len(pending), len(claims) - len(pending))
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    extractions = {}
+    digests = {}
+
+    with ProcessPoolExecutor(max_workers=extract_workers) as pool, open(output_path, "a", encoding="utf-8") as out:
+        async def extract(pdf_path: str, selection: dict | None):
+            # Fills the text cache that amain reads from, with the same page/section
+            # selection. Text extraction and every scanned page's OCR are separate
+            # pool tasks, so one large scan can't hold up the rest of the batch.
+            # Hashing and cache I/O stay off the event loop too.
+            doc_hash = await loop.run_in_executor(pool, file_hash, pdf_path)
+            if await loop.run_in_executor(None, partial(cached_text, pdf_path, doc_hash=doc_hash, selection=selection)) is not None:
+                return
+            pages, scanned = await loop.run_in_executor(pool, partial(extract_pages, pdf_path, **(selection or {})))
+            if scanned:
+                if not ocr_available():
+                    # Nothing cached: the pages are read again once Tesseract is installed
+                    warn_unread(pdf_path, scanned)
+                    return
+                texts = await asyncio.gather(*(loop.run_in_executor(pool, ocr_page, pdf_path, page_number) for page_number in scanned))
+                apply_ocr(pages, dict(zip(scanned, texts)))
+            await loop.run_in_executor(None, partial(store_text, pdf_path, "\n".join(pages.values()), doc_hash=doc_hash, selection=selection))
+
+        def extracted(pdf_path: str, selection: dict | None):
+            key = (pdf_path, selection_key(selection))
+            if key not in extractions:
+                extractions[key] = asyncio.ensure_future(extract(pdf_path, selection))
+            return extractions[key]
+
+        async def digested(pdf_path: str):
+            # One digest build per policy, shared by every claim that cites it
+            if pdf_path not in digests:
+                digests[pdf_path] = asyncio.ensure_future(aget_coverage_digest(pdf_path, selection=policy_selection, executor=pool))
+            return await digests[pdf_path]
+
+        def write(record: dict):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+
+        async def process(claim: dict):
+            start = time.perf_counter()
+            try:
+                await asyncio.gather(extracted(claim["policy"], policy_selection), extracted(claim["receipt"], receipt_selection))
+                async with semaphore:
+                    if use_digest:
+                        await digested(claim["policy"])
+                    report = await amain(
+                        claim["claim_no"], claim["list_item"], claim["name"], claim["phone"], claim["email"],
+                        claim["policy"], claim["receipt"], use_digest, pool, policy_selection, receipt_selection
+                    )
+                write({"claim_no": claim["claim_no"], "status": "ok", "seconds": round(time.perf_counter() - start, 3), "report": report})
+            except Exception as e:
+                write({"claim_no": claim["claim_no"], "status": "error", "seconds": round(time.perf_counter() - start, 3), "error": f"{type(e).__name__}: {e}"})
+
+        await asyncio.gather(*(process(claim) for claim in pending))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run claim analysis for every claim in a CSV/JSONL manifest.")
+    parser.add_argument("manifest", help="CSV or JSONL with claim_no, items, claimant, policy, receipt")
+    parser.add_argument("--output", default="results.jsonl", help="JSONL results file; existing successful claims are skipped")
+    parser.add_argument("--extract-workers", type=int, default=None, help="Processes for PDF extraction (default: CPU count)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Claim analyses in flight at once")
+    parser.add_argument("--no-digest", action="store_true", help="Send policy text instead of the cached coverage digest")
+    parser.add_argument("--coverage-sections", action="store_true",
+                        help="Read only the policy's declarations, coverage, insuring agreement, limits and exclusions sections (when its outline names them)")
+    parser.add_argument("--receipt-pages", type=int, default=None, help="Read only this many pages of each receipt")
+    args = parser.parse_args()
+    # Progress goes to stderr, so stdout stays clean
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    policy_selection = POLICY_SELECTION if args.coverage_sections else None
+    receipt_selection = {**RECEIPT_SELECTION, "pages": range(args.receipt_pages)} if args.receipt_pages else None
+    asyncio.run(run_batch(args.manifest, args.output, args.extract_workers, args.concurrency, not args.no_digest, policy_selection, receipt_selection))
+
+if __name__ == "__main__":
+    main()
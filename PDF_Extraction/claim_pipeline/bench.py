@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import sys
+import time
+from langchain_openai import ChatOpenAI
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from .map_reduce import split_policy
+from .model import CLAIM_ANALYSIS_TEMPLATE, claim_analysis_chain
+from .pdf_loader import POLICY_SELECTION, RECEIPT_SELECTION, extract_pages, load_pdf
+from .receipt_parser import extract_receipt, format_receipt_for_prompt
+from .report_stream import REPORT_SECTIONS, SectionSplitter
+
+BENCH_ITEMS = ["Item1", "Item2"]
+
+def _per_claim_chain():
+    # What model_init used to do for every claim: new client, re-parsed template
+    llm = ChatOpenAI(model="gpt-4o", temperature=0.3, max_tokens=2048, openai_api_key="bench")
+    template = ChatPromptTemplate.from_messages(CLAIM_ANALYSIS_TEMPLATE.messages)
+    return template | llm | StrOutputParser()
+
+def bench_chain_setup(claims: int = 200):
+    """
+    Per-claim chain construction cost in the batch path: rebuilt per claim vs the shared chain.
+    """
+    start = time.perf_counter()
+    for _ in range(claims):
+        _per_claim_chain()
+    rebuilt = (time.perf_counter() - start) / claims
+
+    start = time.perf_counter()
+    for _ in range(claims):
+        claim_analysis_chain()
+    shared = (time.perf_counter() - start) / claims
+    return {"rebuilt_ms": rebuilt * 1000, "shared_ms": shared * 1000}
+
+def _timed(fn, repeat: int):
+    # Best of `repeat` runs; the minimum is the least noisy estimate on a shared machine
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+def _sample_report():
+    return "".join(f"{section}\n" + "The claimed items are covered under the policy terms.\n" * 20 for section in REPORT_SECTIONS)
+
+def bench_stages(policy_pdf: str = "pdf1.pdf", receipt_pdf: str = "pdf2.pdf", repeat: int = 5):
+    """
+    Milliseconds per pipeline stage that runs locally, without OCR or model calls.
+    """
+    policy = load_pdf(policy_pdf, ocr=False)
+    receipt_text = load_pdf(receipt_pdf, ocr=False)
+    receipt = extract_receipt(receipt_pdf)
+    inputs = {
+        "claim_no": 123456,
+        "name": "John Doe",
+        "phone": "123-456-7890",
+        "email": "johndoes@gmail.com",
+        "list_item": BENCH_ITEMS,
+        "policy": policy,
+        "receipt": format_receipt_for_prompt(receipt, BENCH_ITEMS) + "\n\n" + receipt_text,
+    }
+    report = _sample_report()
+
+    def stream_report():
+        splitter = SectionSplitter()
+        for i in range(0, len(report), 8):
+            splitter.feed(report[i:i + 8])
+        splitter.close()
+
+    return {
+        "load_policy_ms": _timed(lambda: load_pdf(policy_pdf, ocr=False), repeat),
+        "load_receipt_ms": _timed(lambda: load_pdf(receipt_pdf, ocr=False), repeat),
+        "load_policy_selected_ms": _timed(lambda: load_pdf(policy_pdf, ocr=False, **POLICY_SELECTION), repeat),
+        "load_receipt_selected_ms": _timed(lambda: load_pdf(receipt_pdf, ocr=False, **RECEIPT_SELECTION), repeat),
+        "extract_pages_ms": _timed(lambda: extract_pages(policy_pdf), repeat),
+        "extract_receipt_ms": _timed(lambda: extract_receipt(receipt_pdf), repeat),
+        "split_policy_ms": _timed(lambda: split_policy(policy), repeat),
+        "chain_setup_ms": _timed(claim_analysis_chain, repeat),
+        "format_prompt_ms": _timed(lambda: CLAIM_ANALYSIS_TEMPLATE.format_messages(**inputs), repeat),
+        "stream_report_ms": _timed(stream_report, repeat),
+    }
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.5, floor_ms: float = 1.0):
+    """
+    Stages more than `tolerance` (a fraction) slower than the baseline.
+    Stages under floor_ms in both runs are too small to time reliably and are skipped.
+    """
+    regressions = {}
+    for stage, before in baseline.items():
+        after = results.get(stage)
+        if after is None or max(before, after) < floor_ms:
+            continue
+        if after > before * (1 + tolerance):
+            regressions[stage] = (before, after)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark each local stage of the claim pipeline.")
+    parser.add_argument("--policy", default="pdf1.pdf")
+    parser.add_argument("--receipt", default="pdf2.pdf")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--claims", type=int, default=200, help="claims to build chains for in the chain setup comparison")
+    parser.add_argument("--save", help="write the results to this JSON file as a baseline")
+    parser.add_argument("--compare", help="baseline JSON file to check the results against")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown per stage, as a fraction")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "bench")  # Chains are built but never invoked
+    results = bench_stages(args.policy, args.receipt, args.repeat)
+    # Chain construction per claim: rebuilt every time vs the shared chain
+    results.update({f"chain_{key}": ms for key, ms in bench_chain_setup(args.claims).items()})
+    for stage, ms in results.items():
+        print(f"{stage:<26} {ms:10.3f} ms")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for stage, (before, after) in regressions.items():
+            print(f"REGRESSION {stage}: {before:.3f} ms -> {after:.3f} ms")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
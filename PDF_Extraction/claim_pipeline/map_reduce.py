@@ -0,0 +1,65 @@
+import asyncio
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from .model import claim_analysis_chain, clause_extraction_chain
+
+# Policies longer than this (in characters, roughly 4 per token) go through map-reduce
+MAP_REDUCE_THRESHOLD = 60000
+SECTION_SIZE = 16000
+SECTION_OVERLAP = 400
+NO_CLAUSES = "NO RELEVANT CLAUSES"
+
+def split_policy(policy: str, section_size: int = SECTION_SIZE, section_overlap: int = SECTION_OVERLAP):
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=section_size,
+        chunk_overlap=section_overlap,
+        separators=["\n\n", "\n", " ", ""]
+    )
+    return splitter.split_text(policy)
+
+async def extract_clauses(sections: list[str], list_item: list[str], max_concurrency: int = 4):
+    """
+    Map stage: pull the clauses relevant to the claimed items out of each section, at most max_concurrency at a time.
+    """
+    chain = clause_extraction_chain()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def extract(section_no: int, section: str):
+        async with semaphore:
+            return await chain.ainvoke({
+                "section_no": section_no,
+                "section_count": len(sections),
+                "list_item": list_item,
+                "section": section
+            })
+
+    results = await asyncio.gather(*(extract(i + 1, section) for i, section in enumerate(sections)))
+    return [clauses.strip() for clauses in results if clauses.strip() and NO_CLAUSES not in clauses]
+
+async def reduce_policy(policy: str, list_item: list[str], max_concurrency: int = 4):
+    """
+    Shrink a policy too long to send whole to the clauses relevant to the claimed
+    items: extract per section in parallel, then collapse again while still too long.
+    """
+    relevant_policy = "\n\n".join(await extract_clauses(split_policy(policy), list_item, max_concurrency))
+    while len(relevant_policy) > MAP_REDUCE_THRESHOLD:
+        collapsed = "\n\n".join(await extract_clauses(split_policy(relevant_policy), list_item, max_concurrency))
+        if len(collapsed) >= len(relevant_policy):
+            break  # Nothing left to drop
+        relevant_policy = collapsed
+    if not relevant_policy:
+        relevant_policy = "(No policy clauses relevant to the claimed items were found.)"
+    return "Relevant clauses extracted from the policy:\n\n" + relevant_policy
+
+async def analyse_claim_map_reduce(claim_no: int, list_item: list[str], name: str, phone: str, email: str, policy: str, receipt: str, max_concurrency: int = 4):
+    """
+    Generate the claim analysis report on the clauses reduce_policy keeps.
+    """
+    return await claim_analysis_chain().ainvoke({
+        "claim_no": claim_no,
+        "name": name,
+        "phone": phone,
+        "email": email,
+        "list_item": list_item,
+        "policy": await reduce_policy(policy, list_item, max_concurrency),
+        "receipt": receipt
+    })
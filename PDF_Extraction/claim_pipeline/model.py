@@ -0,0 +1,120 @@
+from langchain_openai import ChatOpenAI
+import os
+from dotenv import load_dotenv
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from functools import lru_cache
+
+load_dotenv()
+
+@lru_cache(maxsize=None)
+def get_llm(temperature: float = 0.3, max_tokens: int = 2048):
+    """
+    Shared ChatOpenAI client per configuration. Reusing it keeps the underlying
+    HTTP connections pooled instead of opening a new client for every claim.
+    """
+    return ChatOpenAI(
+        model="gpt-4o",
+        temperature=temperature,
+        max_tokens=max_tokens,
+        openai_api_key=os.getenv("OPENAI_API_KEY")
+    )
+
+CLAIM_ANALYSIS_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert insurance claim processor and document analyzer. Your role is to generate comprehensive claim analysis reports by consolidating information from multiple sources. You must preserve ALL numerical data, dates, amounts, policy numbers, and specific details without any approximation or loss of precision."""),
+    ("user", """Generate a comprehensive insurance claim analysis report using the provided information:
+
+        CLAIM DETAILS:
+        - Claim Number: {claim_no}
+        - Claimant Name: {name}
+        - Contact Phone: {phone}
+        - Contact Email: {email}
+        - Claimed Items: {list_item}
+
+        POLICY DOCUMENT:
+        {policy}
+
+        RECEIPT/DOCUMENTATION:
+        {receipt}
+
+        ANALYSIS REQUIREMENTS:
+        1. CLAIM VALIDATION: Cross-reference the claimed items against policy coverage and provided receipts
+        2. NUMERICAL ACCURACY: Preserve ALL exact amounts, dates, policy numbers, and quantities
+        3. COVERAGE ASSESSMENT: Determine coverage eligibility for each claimed item
+        4. DISCREPANCY IDENTIFICATION: Highlight any inconsistencies between policy, receipts, and claimed items
+        5. FINANCIAL SUMMARY: Calculate total claim amount, covered amounts, deductibles, and out-of-pocket costs
+        6. RECOMMENDATIONS: Provide approval/denial recommendations with detailed justifications
+
+        OUTPUT FORMAT:
+        Structure your response with clear sections including:
+        - Executive Summary
+        - Claim Details Verification
+        - Item-by-Item Analysis
+        - Financial Breakdown (with exact figures)
+        - Policy Compliance Assessment
+        - Final Recommendations
+        - Required Next Steps
+
+        CRITICAL: Maintain complete accuracy of all numbers, dates, names, and financial data. Do not round, approximate, or omit any numerical information.""")])
+
+CLAUSE_EXTRACTION_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert insurance policy analyst. You extract policy language verbatim. You must preserve ALL numerical data, dates, amounts, limits, deductibles, and policy numbers exactly as written."""),
+    ("user", """The following is part {section_no} of {section_count} of an insurance policy.
+
+        CLAIMED ITEMS:
+        {list_item}
+
+        POLICY SECTION:
+        {section}
+
+        Extract every clause from this section that affects coverage of the claimed items: coverage grants, exclusions, limits, sub-limits, deductibles, conditions, definitions, claim procedures, and the declarations (policy number, insured, period, insurer).
+        Quote each clause verbatim with its heading or clause number. Do not summarise, paraphrase, or add commentary.
+        If nothing in this section is relevant, reply with exactly: NO RELEVANT CLAUSES""")])
+
+COVERAGE_DIGEST_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert insurance policy analyst. You condense policies into a compact coverage digest that claim processors use instead of the full document. You must preserve ALL numerical data, dates, amounts, limits, deductibles, and policy numbers exactly as written."""),
+    ("user", """Produce a coverage digest of the following policy text (part {section_no} of {section_count}). The text may be raw policy pages or digests of other parts of the same policy; merge duplicates.
+
+        POLICY TEXT:
+        {policy}
+
+        OUTPUT FORMAT (keep these headings, write "None stated" when a heading has no content):
+        DECLARATIONS: insurer, policy number, named insured, policy period, insured property/locations
+        COVERAGES: each coverage part with its limit and sub-limits
+        DEDUCTIBLES: each deductible and what it applies to
+        EXCLUSIONS: each exclusion, quoted or closely paraphrased with its clause number
+        CONDITIONS: claim conditions, notice and proof-of-loss deadlines, valuation basis (ACV/RCV)
+        DEFINITIONS: only definitions that change what is covered
+
+        Be concise but never drop or round a number, date, or limit.""")])
+
+@lru_cache(maxsize=None)
+def _shared_chain(name: str):
+    template, temperature, max_tokens = {
+        "claim_analysis": (CLAIM_ANALYSIS_TEMPLATE, 0.3, 2048),
+        "clause_extraction": (CLAUSE_EXTRACTION_TEMPLATE, 0, 1024),
+        "coverage_digest": (COVERAGE_DIGEST_TEMPLATE, 0, 2048),
+    }[name]
+    return template | get_llm(temperature, max_tokens) | StrOutputParser()
+
+def claim_analysis_chain(llm=None):
+    """
+    Claim analysis chain, built once per process. Pass llm to inject a client instead of the shared one.
+    """
+    if llm is not None:
+        return CLAIM_ANALYSIS_TEMPLATE | llm | StrOutputParser()
+    return _shared_chain("claim_analysis")
+
+def clause_extraction_chain(llm=None):
+    if llm is not None:
+        return CLAUSE_EXTRACTION_TEMPLATE | llm | StrOutputParser()
+    return _shared_chain("clause_extraction")
+
+def coverage_digest_chain(llm=None):
+    if llm is not None:
+        return COVERAGE_DIGEST_TEMPLATE | llm | StrOutputParser()
+    return _shared_chain("coverage_digest")
+
+def model_init(*args, **kwargs):
+    # Kept for existing callers; the claim fields are template inputs, not construction arguments
+    return claim_analysis_chain()
@@ -0,0 +1,89 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pymupdf
+
+# OCR text is cached per page fingerprint, so re-running a scanned document is free
+OCR_CACHE_DIR = os.path.join(os.getenv("CLAIM_CACHE_DIR", "cache"), "ocr")
+# Pages with fewer extractable characters than this, and at least one image, are treated as scans
+MIN_TEXT_CHARS = 20
+
+def ocr_available():
+    try:
+        pymupdf.get_tessdata()
+    except RuntimeError:
+        return False
+    return True
+
+def needs_ocr(page, text: str):
+    return len(text.strip()) < MIN_TEXT_CHARS and bool(page.get_images())
+
+def page_fingerprint(doc, page):
+    """
+    Hash of the page's content stream and image data; identical scanned pages hash the same.
+    """
+    sha256 = hashlib.sha256(page.read_contents())
+    for image in page.get_images():
+        sha256.update(doc.xref_stream_raw(image[0]) or b"")
+    return sha256.hexdigest()
+
+def _cache_path(fingerprint: str, language: str, dpi: int):
+    return os.path.join(OCR_CACHE_DIR, f"{fingerprint}-{language}-{dpi}.txt")
+
+def cached_ocr(pdf_path: str, page_number: int, language: str = "eng", dpi: int = 300):
+    with pymupdf.open(pdf_path) as doc:
+        path = _cache_path(page_fingerprint(doc, doc[page_number]), language, dpi)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    return None
+
+def ocr_page(pdf_path: str, page_number: int, language: str = "eng", dpi: int = 300):
+    """
+    OCR one page with Tesseract through PyMuPDF. Opens the file itself so it can run in a worker process.
+    """
+    with pymupdf.open(pdf_path) as doc:
+        page = doc[page_number]
+        path = _cache_path(page_fingerprint(doc, page), language, dpi)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        textpage = page.get_textpage_ocr(language=language, dpi=dpi, full=True)
+        text = page.get_text(textpage=textpage)
+    os.makedirs(OCR_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return text
+
+def ocr_pages(pdf_path: str, page_numbers: list[int], language: str = "eng", dpi: int = 300, max_workers: int | None = None, executor=None):
+    """
+    OCR the given pages, serving cached pages directly and spreading the rest
+    across a process pool (the given executor, or a new one).
+    Returns {page_number: text}.
+    """
+    results = {}
+    misses = []
+    for page_number in page_numbers:
+        text = cached_ocr(pdf_path, page_number, language, dpi)
+        if text is None:
+            misses.append(page_number)
+        else:
+            results[page_number] = text
+    if not misses:
+        return results
+    if executor is None and (len(misses) == 1 or max_workers == 1):
+        for page_number in misses:
+            results[page_number] = ocr_page(pdf_path, page_number, language, dpi)
+        return results
+    own_executor = executor is None
+    executor = executor or ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {page_number: executor.submit(ocr_page, pdf_path, page_number, language, dpi) for page_number in misses}
+        for page_number, future in futures.items():
+            results[page_number] = future.result()
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return results
@@ -0,0 +1,165 @@
+import re
+import warnings
+import pymupdf
+from .ocr import needs_ocr, ocr_available, ocr_pages
+
+# Lines longer than this are body text, never a section heading
+MAX_HEADING_CHARS = 80
+# Opt-in selections for faster claims (claim_inputs and the batch runner read
+# whole documents by default): the first pages of a receipt, and the policy
+# sections that decide coverage when the outline names them (otherwise every
+# page). Conditions and definitions sections are left out of POLICY_SELECTION.
+RECEIPT_SELECTION = {"pages": range(2)}
+POLICY_SELECTION = {"sections": ["declarations", "coverage", "insuring agreement", "limits of liability", "exclusions"]}
+
+def page_text(page, text_mode="text", sort=False, flags=None, clip=None):
+    """
+    Extract one page as plain text.
+    text_mode is a PyMuPDF get_text mode: "text" (default), "blocks" or "words"
+    are returned as clean text; string modes such as "html" or "xml" are passed through.
+    clip limits extraction to a region of the page, as a pymupdf.Rect or (x0, y0, x1, y1).
+    """
+    content = page.get_text(text_mode, sort=sort, flags=flags, clip=clip)
+    if text_mode == "blocks":
+        # (x0, y0, x1, y1, text, block_no, block_type); type 1 is an image block
+        return "\n".join(block[4].strip() for block in content if block[6] == 0)
+    if text_mode == "words":
+        return " ".join(word[4] for word in content)
+    return content
+
+def iter_pdf_pages(pdf_path, text_mode="text", sort=False, flags=None):
+    """
+    Yield the text of each page, one at a time.
+    """
+    with pymupdf.open(pdf_path) as doc:
+        for page in doc:
+            yield page_text(page, text_mode, sort, flags)
+
+def heading_pattern(headings, whole_line=False):
+    """
+    Regex matching a line that starts with one of the headings, allowing
+    section numbering such as "2.", "II" or "Section 3" in front, and plurals.
+    With whole_line the heading must be all there is on the line, apart from
+    a trailing colon, so body text starting with the same word doesn't match.
+    """
+    names = "|".join(re.escape(heading.strip()) for heading in headings)
+    end = r"\s*:?\s*$" if whole_line else r"\b"
+    return re.compile(rf"^\s*(?:(?:section|part|article)\s+)?(?:[\dIVXivx]+[.)]?[\d.]*\s+)?(?:{names})s?{end}", re.IGNORECASE)
+
+def outline(doc):
+    """
+    The document outline as (level, title, page_number) with 0-based page
+    numbers; empty when the PDF has no bookmarks.
+    """
+    return [(level, title.strip(), page - 1) for level, title, page in doc.get_toc() if title.strip() and page > 0]
+
+def section_pages(doc, headings):
+    """
+    Page numbers covered by the outline sections whose title matches one of
+    the headings, in order. A section runs to the page where the next entry at
+    the same or a higher level starts. None when the outline has no match.
+    """
+    pattern = heading_pattern(headings)
+    entries = outline(doc)
+    pages = set()
+    for i, (level, title, start) in enumerate(entries):
+        if not pattern.match(title):
+            continue
+        end = doc.page_count - 1
+        for next_level, _, next_start in entries[i + 1:]:
+            if next_level <= level:
+                end = max(start, next_start)
+                break
+        pages.update(range(start, end + 1))
+    return sorted(pages) if pages else None
+
+def _cut_at_heading(text, pattern):
+    # Text before the first line that is a matching heading (the whole line; see heading_pattern), or None if there is none
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        if len(line.strip()) <= MAX_HEADING_CHARS and pattern.match(line.rstrip("\r\n")):
+            return text[:offset]
+        offset += len(line)
+    return None
+
+def select_pages(doc, pages=None, sections=None):
+    """
+    Page numbers to read: the given 0-based page numbers or range, narrowed to
+    the outline sections named in sections when the outline has them.
+    """
+    selected = [number for number in (range(doc.page_count) if pages is None else pages) if 0 <= number < doc.page_count]
+    if sections:
+        in_sections = section_pages(doc, sections)
+        if in_sections is not None:
+            in_sections = set(in_sections)
+            selected = [number for number in selected if number in in_sections]
+    return selected
+
+def extract_pages(pdf_path, text_mode="text", sort=False, flags=None, pages=None, sections=None, stop_at=None, clip=None):
+    """
+    Return ({page number: text}, numbers of image-only pages that need OCR).
+    pages and sections restrict which pages are read (see select_pages);
+    stop_at is a list of headings: reading stops just before the first line
+    that matches one, using the outline to skip pages past it. With clip only
+    that region's text layer is read, so no page is sent to OCR.
+    """
+    texts, scanned = {}, []
+    stop = heading_pattern(stop_at, whole_line=True) if stop_at else None
+    # Outline titles are headings already, so a title only has to start with one
+    stop_title = heading_pattern(stop_at) if stop_at else None
+    with pymupdf.open(pdf_path) as doc:
+        selected = select_pages(doc, pages, sections)
+        last_page = doc.page_count - 1
+        if stop is not None and selected:
+            # The outline says where the stop heading starts without reading the pages before it
+            last_page = next((page for _, title, page in outline(doc) if page >= selected[0] and stop_title.match(title)), last_page)
+        for number in selected:
+            if number > last_page:
+                break
+            page = doc[number]
+            text = page_text(page, text_mode, sort, flags, clip)
+            cut = _cut_at_heading(text, stop) if stop is not None else None
+            if cut is not None:
+                if cut.strip():
+                    texts[number] = cut
+                break
+            if clip is None and needs_ocr(page, text):
+                scanned.append(number)
+            texts[number] = text
+    return texts, scanned
+
+def apply_ocr(pages, ocr_text):
+    for page_number, text in ocr_text.items():
+        pages[page_number] = text
+    return pages
+
+def warn_unread(pdf_path, scanned):
+    warnings.warn(f"{len(scanned)} scanned page(s) in {pdf_path} have no text and Tesseract is not installed", RuntimeWarning, stacklevel=3)
+
+def load_pdf_checked(pdf_path, text_mode="text", sort=False, flags=None, ocr=True, ocr_language="eng", ocr_workers=None, executor=None,
+                     pages=None, sections=None, stop_at=None, clip=None):
+    """
+    load_pdf, also returning the numbers of scanned pages whose text is
+    missing because they were not OCRed: (text, unread pages).
+    """
+    texts, scanned = extract_pages(pdf_path, text_mode, sort, flags, pages, sections, stop_at, clip)
+    unread = []
+    if ocr and scanned:
+        if ocr_available():
+            apply_ocr(texts, ocr_pages(pdf_path, scanned, ocr_language, max_workers=ocr_workers, executor=executor))
+        else:
+            warn_unread(pdf_path, scanned)
+            unread = scanned
+    elif scanned:
+        unread = scanned
+    return "\n".join(texts.values()), unread
+
+def load_pdf(pdf_path, text_mode="text", sort=False, flags=None, ocr=True, ocr_language="eng", ocr_workers=None, executor=None,
+             pages=None, sections=None, stop_at=None, clip=None):
+    """
+    Text of the PDF, or of the pages, sections and region selected as in
+    extract_pages. Scanned (image-only) pages are OCRed in parallel when
+    Tesseract is available, using executor if given; otherwise a
+    RuntimeWarning says how many pages have no text.
+    """
+    return load_pdf_checked(pdf_path, text_mode, sort, flags, ocr, ocr_language, ocr_workers, executor, pages, sections, stop_at, clip)[0]
@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from functools import partial
+from .pdf_loader import load_pdf_checked
+from .map_reduce import MAP_REDUCE_THRESHOLD, split_policy
+from .model import coverage_digest_chain
+
+# Extracted text and coverage digests are stored per document content hash, so
+# every claim against the same policy file reuses them
+CACHE_DIR = os.getenv("CLAIM_CACHE_DIR", "cache")
+
+def file_hash(path: str):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+def _cache_path(kind: str, key: str, extension: str):
+    return os.path.join(CACHE_DIR, kind, f"{key}.{extension}")
+
+def _write_atomic(path: str, content: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def selection_key(selection: dict | None):
+    # Text extracted with a page/section/region selection is cached apart from the full text
+    if not selection:
+        return ""
+    return "-" + hashlib.sha256(repr(sorted(selection.items())).encode()).hexdigest()[:12]
+
+def _text_cache_path(doc_hash: str, text_mode: str, selection: dict | None = None):
+    return _cache_path("text", f"{doc_hash}-{text_mode}{selection_key(selection)}", "txt")
+
+def cached_text(pdf_path: str, text_mode: str = "text", doc_hash: str | None = None, selection: dict | None = None):
+    path = _text_cache_path(doc_hash or file_hash(pdf_path), text_mode, selection)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    return None
+
+def store_text(pdf_path: str, text: str, text_mode: str = "text", doc_hash: str | None = None, selection: dict | None = None):
+    _write_atomic(_text_cache_path(doc_hash or file_hash(pdf_path), text_mode, selection), text)
+
+def _load_text(pdf_path: str, text_mode: str, doc_hash: str, executor, selection: dict | None):
+    # (text, complete); text with scanned pages missing for want of OCR is never
+    # cached, so it is extracted again once Tesseract is installed
+    text = cached_text(pdf_path, text_mode, doc_hash, selection)
+    if text is not None:
+        return text, True
+    text, unread = load_pdf_checked(pdf_path, text_mode=text_mode, executor=executor, **(selection or {}))
+    if not unread:
+        store_text(pdf_path, text, text_mode, doc_hash, selection)
+    return text, not unread
+
+def load_pdf_cached(pdf_path: str, text_mode: str = "text", doc_hash: str | None = None, executor=None, selection: dict | None = None):
+    """
+    load_pdf through the text cache. selection holds load_pdf's pages,
+    sections, stop_at and clip options.
+    """
+    return _load_text(pdf_path, text_mode, doc_hash or file_hash(pdf_path), executor, selection)[0]
+
+async def build_coverage_digest(policy: str, max_concurrency: int = 4):
+    """
+    Digest each section of the policy concurrently, then merge the partial digests until one remains.
+    """
+    chain = coverage_digest_chain()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def digest(section_no: int, section_count: int, text: str):
+        async with semaphore:
+            return await chain.ainvoke({"section_no": section_no, "section_count": section_count, "policy": text})
+
+    parts = split_policy(policy) if len(policy) > MAP_REDUCE_THRESHOLD else [policy]
+    while True:
+        digests = await asyncio.gather(*(digest(i + 1, len(parts), part) for i, part in enumerate(parts)))
+        if len(digests) == 1:
+            return digests[0].strip()
+        parts = split_policy("\n\n".join(digests))
+        if len(parts) >= len(digests):
+            # Digests no longer shrink when regrouped; merge them in one call
+            parts = ["\n\n".join(digests)]
+
+async def aget_coverage_digest(pdf_path: str, max_concurrency: int = 4, selection: dict | None = None, executor=None):
+    """
+    Return the cached coverage digest for this policy file (or the selected
+    part of it), building it on first use. Hashing and text extraction run
+    in executor (default: the loop's thread pool), off the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    doc_hash = await loop.run_in_executor(executor, file_hash, pdf_path)
+    path = _cache_path("digest", doc_hash + selection_key(selection), "json")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["digest"]
+    policy, complete = await loop.run_in_executor(executor, partial(_load_text, pdf_path, "text", doc_hash, None, selection))
+    digest = await build_coverage_digest(policy, max_concurrency)
+    if not complete:
+        return digest  # Built without the scanned pages; don't keep it
+    _write_atomic(path, json.dumps({
+        "source": os.path.basename(pdf_path),
+        "sha256": doc_hash,
+        "created_at": time.time(),
+        "digest": digest
+    }))
+    return digest
+
+def get_coverage_digest(pdf_path: str, max_concurrency: int = 4, selection: dict | None = None):
+    return asyncio.run(aget_coverage_digest(pdf_path, max_concurrency, selection))
@@ -0,0 +1,225 @@
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from difflib import SequenceMatcher
+import pymupdf
+
+AMOUNT_RE = re.compile(r"^\(?-?\s*[$€£]?\s*-?\d[\d,]*(?:\.\d+)?\)?$")
+# A money figure has cents or a currency sign; a bare integer may be an invoice number or a ZIP code
+MONEY_RE = re.compile(r"[$€£]|\d\.\d{2}\)?$")
+DATE_RE = re.compile(
+    r"\b(\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}|\d{4}-\d{2}-\d{2}|"
+    r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?\s+\d{1,2},?\s+\d{4})\b"
+)
+# Rows labelled like these are receipt-level figures, not purchased items
+SUMMARY_LABEL_RE = re.compile(
+    r"\b(sub\s*total|total|tax|vat|gst|balance|due|payment|paid|amount|amt|discount|tip|change|shipping)\b",
+    re.IGNORECASE
+)
+COLUMN_ROLES = {
+    "description": re.compile(r"item|description|product|service|particular|details|for payment of", re.IGNORECASE),
+    "quantity": re.compile(r"\bqty\b|quantity|units?\b", re.IGNORECASE),
+    "unit_price": re.compile(r"unit|price|rate|each", re.IGNORECASE),
+    "amount": re.compile(r"amount|total|line total|cost|sum", re.IGNORECASE),
+    "date": re.compile(r"date", re.IGNORECASE),
+}
+
+@dataclass
+class LineItem:
+    description: str
+    amount: Decimal
+    quantity: Decimal | None = None
+    unit_price: Decimal | None = None
+    date: str | None = None
+    page: int = 0
+
+@dataclass
+class Receipt:
+    line_items: list[LineItem] = field(default_factory=list)
+    figures: dict[str, Decimal] = field(default_factory=dict)
+    dates: list[str] = field(default_factory=list)
+
+def parse_amount(text: str):
+    text = (text or "").strip()
+    if not text or not AMOUNT_RE.match(text):
+        return None
+    negative = text.startswith("(") or "-" in text
+    digits = re.sub(r"[^\d.]", "", text)
+    try:
+        value = Decimal(digits)
+    except InvalidOperation:
+        return None
+    return -value if negative else value
+
+def _column_roles(header: list[str]):
+    roles = {}
+    for index, name in enumerate(header):
+        for role, pattern in COLUMN_ROLES.items():
+            if role not in roles and pattern.search(name or ""):
+                roles[role] = index
+                break
+    return roles if "amount" in roles else None
+
+def _row_to_entry(cells: list[str], roles: dict | None):
+    if roles:
+        amount = parse_amount(cells[roles["amount"]]) if roles["amount"] < len(cells) else None
+        description = cells[roles["description"]] if "description" in roles and roles["description"] < len(cells) else ""
+        quantity = parse_amount(cells[roles["quantity"]]) if "quantity" in roles and roles["quantity"] < len(cells) else None
+        unit_price = parse_amount(cells[roles["unit_price"]]) if "unit_price" in roles and roles["unit_price"] < len(cells) else None
+        date = cells[roles["date"]] if "date" in roles and roles["date"] < len(cells) else None
+    else:
+        # No header: the last numeric cell is the amount if it looks like money, the first text cell describes it
+        amounts = [parse_amount(cell) for cell in cells]
+        numbers = [value for value in amounts if value is not None]
+        last = next((cell for cell, value in zip(reversed(cells), reversed(amounts)) if value is not None), "")
+        amount = numbers[-1] if numbers and MONEY_RE.search(last) else None
+        description = next((cell for cell, value in zip(cells, amounts) if cell and value is None and cell not in "$€£"), "")
+        # Three trailing numbers read as quantity, unit price, amount
+        quantity, unit_price = (numbers[-3], numbers[-2]) if len(numbers) >= 3 else (None, None)
+        date = None
+    if amount is None or not description:
+        return None
+    return LineItem(description=description, amount=amount, quantity=quantity, unit_price=unit_price, date=date or None)
+
+def _page_rows(page):
+    """
+    Yield (cells, roles) for every row on the page: table rows first, and
+    layout lines ending in an amount when the page has no tables.
+    """
+    tables = page.find_tables().tables
+    for table in tables:
+        rows = [[(cell or "").strip() for cell in row] for row in table.extract()]
+        rows = [row for row in rows if any(row)]
+        if not rows:
+            continue
+        roles = _column_roles(table.header.names) if table.header.external else _column_roles(rows[0])
+        if roles and not table.header.external:
+            rows = rows[1:]
+        for row in rows:
+            yield row, roles
+    if tables:
+        return
+    # No ruled tables: rebuild visual rows from word positions, since table cells
+    # without borders are often separate layout blocks on the same baseline
+    rows = []
+    for x0, y0, x1, y1, word, *_ in sorted(page.get_text("words"), key=lambda w: ((w[1] + w[3]) / 2, w[0])):
+        middle = (y0 + y1) / 2
+        if rows and abs(middle - rows[-1][0]) < (y1 - y0) / 2:
+            rows[-1][1].append((x0, word))
+        else:
+            rows.append([middle, [(x0, word)]])
+    for _, words in rows:
+        words = [word for _, word in sorted(words)]
+        split = len(words)
+        while split > 0 and parse_amount(words[split - 1]) is not None:
+            split -= 1
+        if 0 < split < len(words):
+            yield [" ".join(words[:split]), *words[split:]], None
+
+def extract_receipt(pdf_path: str, max_pages: int | None = None):
+    """
+    Pull line items, labelled figures (total, tax, balance due, ...) and dates
+    out of a receipt locally with PyMuPDF table detection and layout lines.
+    Repeated rows on a page are separate purchases and are all kept; only a
+    page whose rows repeat an earlier page exactly (a second copy of the
+    receipt) is skipped.
+    """
+    receipt = Receipt()
+    seen_pages = set()
+    with pymupdf.open(pdf_path) as doc:
+        for page in doc:
+            if max_pages is not None and page.number >= max_pages:
+                break
+            entries = [entry for entry in (_row_to_entry(cells, roles) for cells, roles in _page_rows(page)) if entry is not None]
+            signature = tuple((entry.description.lower(), entry.amount) for entry in entries)
+            if signature in seen_pages:
+                continue
+            if signature:
+                seen_pages.add(signature)
+            for date in DATE_RE.findall(page.get_text()):
+                if date not in receipt.dates:
+                    receipt.dates.append(date)
+            for entry in entries:
+                if SUMMARY_LABEL_RE.search(entry.description):
+                    receipt.figures.setdefault(entry.description, entry.amount)
+                else:
+                    entry.page = page.number + 1
+                    receipt.line_items.append(entry)
+    return receipt
+
+def _match_claimed_items(line_items: list[LineItem], list_item: list[str]):
+    matches = {}
+    for claimed in list_item:
+        claimed_key = str(claimed).lower().strip()
+        best, best_score = None, 0.0
+        for item in line_items:
+            description = item.description.lower()
+            score = 1.0 if claimed_key and (claimed_key in description or description in claimed_key) else SequenceMatcher(None, claimed_key, description).ratio()
+            if score > best_score:
+                best, best_score = item, score
+        matches[claimed] = best if best_score >= 0.75 else None
+    return matches
+
+def financial_summary(receipt: Receipt, list_item: list[str]):
+    """
+    Exact Decimal arithmetic over the extracted rows, so totals never depend on the model.
+    """
+    line_total = sum((item.amount for item in receipt.line_items), Decimal("0"))
+    stated_total = next(
+        (value for label, value in receipt.figures.items() if re.search(r"\btotal\b", label, re.IGNORECASE) and not re.search(r"sub", label, re.IGNORECASE)),
+        None
+    )
+    matches = _match_claimed_items(receipt.line_items, list_item)
+    claimed_total = sum((item.amount for item in matches.values() if item is not None), Decimal("0"))
+    return {
+        "line_item_total": line_total,
+        "stated_total": stated_total,
+        "difference": (stated_total - line_total) if stated_total is not None else None,
+        "quantity_mismatches": [
+            item for item in receipt.line_items
+            if item.quantity is not None and item.unit_price is not None and item.quantity * item.unit_price != item.amount
+        ],
+        "claimed_matches": matches,
+        "claimed_total": claimed_total,
+    }
+
+def _fmt(value):
+    return "" if value is None else f"{value:,.2f}"
+
+def format_receipt_for_prompt(receipt: Receipt, list_item: list[str]):
+    summary = financial_summary(receipt, list_item)
+    lines = ["RECEIPT LINE ITEMS (extracted from the receipt tables; amounts are exact):",
+             "| # | Date | Description | Qty | Unit price | Amount |",
+             "|---|---|---|---|---|---|"]
+    for number, item in enumerate(receipt.line_items, 1):
+        lines.append(f"| {number} | {item.date or ''} | {item.description} | {item.quantity if item.quantity is not None else ''} | {_fmt(item.unit_price)} | {_fmt(item.amount)} |")
+    if receipt.figures:
+        lines.append("STATED FIGURES: " + "; ".join(f"{label}: {_fmt(value)}" for label, value in receipt.figures.items()))
+    if receipt.dates:
+        lines.append("DATES ON RECEIPT: " + ", ".join(receipt.dates))
+    lines.append("FINANCIAL SUMMARY (computed exactly from the rows above; use these figures, do not recompute):")
+    lines.append(f"- Sum of line items: {_fmt(summary['line_item_total'])}")
+    if summary["stated_total"] is not None:
+        difference = summary["difference"]
+        lines.append(f"- Stated receipt total: {_fmt(summary['stated_total'])} ("
+                     + ("matches the sum of line items" if difference == 0 else f"differs from the sum of line items by {_fmt(difference)}") + ")")
+    for item in summary["quantity_mismatches"]:
+        lines.append(f"- Quantity x unit price does not equal the amount for: {item.description}")
+    lines.append("- Claimed items matched to receipt lines:")
+    for claimed, item in summary["claimed_matches"].items():
+        lines.append(f"  - {claimed}: " + (f"{item.description} ({_fmt(item.amount)})" if item else "no matching receipt line"))
+    lines.append(f"- Receipted amount for claimed items: {_fmt(summary['claimed_total'])}")
+    return "\n".join(lines)
+
+def receipt_for_prompt(pdf_path: str, list_item: list[str], text: str, max_pages: int | None = None):
+    """
+    Structured rows plus computed summary when line items were found; otherwise
+    the extracted text, with any figures read from tables appended.
+    """
+    receipt = extract_receipt(pdf_path, max_pages)
+    if receipt.line_items:
+        return format_receipt_for_prompt(receipt, list_item)
+    if receipt.figures:
+        figures = "; ".join(f"{label}: {_fmt(value)}" for label, value in receipt.figures.items())
+        return f"{text}\n\nFIGURES READ FROM RECEIPT TABLES (exact): {figures}"
+    return text
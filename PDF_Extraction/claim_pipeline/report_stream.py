@@ -0,0 +1,83 @@
+import re
+
+# Section headings the claim analysis prompt asks for, in order
+REPORT_SECTIONS = [
+    "Executive Summary",
+    "Claim Details Verification",
+    "Item-by-Item Analysis",
+    "Financial Breakdown",
+    "Policy Compliance Assessment",
+    "Final Recommendations",
+    "Required Next Steps",
+]
+# A heading line is short; longer partial lines can be released without waiting for the newline
+MAX_HEADING_CHARS = 80
+
+def _section_pattern(name: str):
+    # The whole line must be the heading: words in order, any separators, then
+    # optionally a parenthetical note and a colon, as in "Item by Item Analysis:"
+    words = r"[\W_]*".join(re.escape(word) for word in re.findall(r"[A-Za-z]+", name))
+    return re.compile(rf"{words}\s*(?:\([^)]*\))?\s*:?", re.IGNORECASE)
+
+_SECTION_PATTERNS = [(_section_pattern(name), name) for name in REPORT_SECTIONS]
+
+def match_section(line: str):
+    """
+    Return the report section a line is the heading of, e.g. "## 1. Executive
+    Summary", "**Financial Breakdown (with exact figures)**" or "Required Next
+    Steps:", or None. Body text that merely starts with a section name, such as
+    "Final recommendations follow from the analysis above.", is not a heading.
+    """
+    stripped = re.sub(r"^[\s#*_>\-\d.)]+|[\s*_]+$", "", line)
+    if not stripped or len(stripped) > MAX_HEADING_CHARS:
+        return None
+    for pattern, name in _SECTION_PATTERNS:
+        if pattern.fullmatch(stripped):
+            return name
+    return None
+
+class SectionSplitter:
+    """
+    Turns streamed report text into events:
+    {"type": "section", "section": name} when a report section starts, and
+    {"type": "token", "section": name, "text": ...} for content.
+    Text is held back only while the current line could still be a heading.
+    """
+
+    def __init__(self):
+        self.section = None
+        self._line = ""
+        self._released = 0
+
+    def _emit(self, text: str):
+        return [{"type": "token", "section": self.section, "text": text}] if text else []
+
+    def feed(self, text: str):
+        events = []
+        for part in re.split(r"(\n)", text):
+            if part == "\n":
+                events += self._end_line()
+                events += self._emit("\n")
+                continue
+            self._line += part
+            if self._released or len(self._line) > MAX_HEADING_CHARS:
+                events += self._emit(self._line[self._released:])
+                self._released = len(self._line)
+        return events
+
+    def _end_line(self):
+        events = []
+        if not self._released:
+            section = match_section(self._line)
+            if section is not None:
+                self.section = section
+                events.append({"type": "section", "section": section})
+            events += self._emit(self._line)
+        else:
+            events += self._emit(self._line[self._released:])
+        self._line = ""
+        self._released = 0
+        return events
+
+    def close(self):
+        return self._end_line()
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+
+import pymupdf
+
+from claim_pipeline import pdf_loader, policy_cache
+
+
+class TestTextCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = mock.patch.object(policy_cache, "CACHE_DIR", os.path.join(self.tmp.name, "cache"))
+        self.cache.start()
+
+    def tearDown(self):
+        self.cache.stop()
+        self.tmp.cleanup()
+
+    def test_scanned_pages_without_ocr_are_not_cached(self):
+        path = os.path.join(self.tmp.name, "scan.pdf")
+        doc = pymupdf.open()
+        page = doc.new_page()
+        page.insert_image(page.rect, pixmap=pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 50, 50), 0))
+        doc.save(path)
+        doc.close()
+        with mock.patch.object(pdf_loader, "ocr_available", return_value=False), warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.assertEqual(policy_cache.load_pdf_cached(path), "")
+        self.assertTrue(any("Tesseract is not installed" in str(warning.message) for warning in caught))
+        self.assertIsNone(policy_cache.cached_text(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+
+import pymupdf
+
+from claim_pipeline.receipt_parser import extract_receipt, financial_summary
+
+
+def write_receipt(path, pages):
+    doc = pymupdf.open()
+    for rows in pages:
+        page = doc.new_page()
+        for i, (description, amount) in enumerate(rows):
+            y = 72 + 20 * i
+            page.insert_text((72, y), description)
+            page.insert_text((400, y), amount)
+    doc.save(path)
+    doc.close()
+
+
+class TestExtractReceipt(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "receipt.pdf")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_repeated_rows_are_separate_items(self):
+        write_receipt(self.path, [[("Chair", "50.00"), ("Chair", "50.00"), ("Lamp", "20.00"), ("Total", "120.00")]])
+        receipt = extract_receipt(self.path)
+        self.assertEqual([item.description for item in receipt.line_items], ["Chair", "Chair", "Lamp"])
+        summary = financial_summary(receipt, ["Chair"])
+        self.assertEqual(summary["line_item_total"], Decimal("120.00"))
+        self.assertEqual(summary["difference"], Decimal("0"))
+
+    def test_duplicate_copy_of_the_receipt_is_read_once(self):
+        page = [("Chair", "50.00"), ("Lamp", "20.00"), ("Total", "70.00")]
+        write_receipt(self.path, [page, page])
+        summary = financial_summary(extract_receipt(self.path), [])
+        self.assertEqual(summary["line_item_total"], Decimal("70.00"))
+        self.assertEqual(summary["stated_total"], Decimal("70.00"))
+
+    def test_ids_and_zip_codes_are_not_line_items(self):
+        write_receipt(self.path, [[("Invoice No", "10452"), ("Springfield IL", "62704"), ("Chair", "50.00"), ("Total", "$50")]])
+        receipt = extract_receipt(self.path)
+        self.assertEqual([item.description for item in receipt.line_items], ["Chair"])
+        summary = financial_summary(receipt, ["Chair"])
+        self.assertEqual(summary["line_item_total"], Decimal("50.00"))
+        self.assertEqual(summary["difference"], Decimal("0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from claim_pipeline.report_stream import SectionSplitter, match_section
+
+
+class TestMatchSection(unittest.TestCase):
+    def test_heading_lines(self):
+        self.assertEqual(match_section("## 1. Executive Summary"), "Executive Summary")
+        self.assertEqual(match_section("**Financial Breakdown (with exact figures)**"), "Financial Breakdown")
+        self.assertEqual(match_section("Item by Item Analysis:"), "Item-by-Item Analysis")
+        self.assertEqual(match_section("Required Next Steps"), "Required Next Steps")
+
+    def test_body_sentences_are_not_headings(self):
+        self.assertIsNone(match_section("Final recommendations follow from the analysis above."))
+        self.assertIsNone(match_section("1. Executive summary of the insured's statement is attached."))
+
+    def test_splitter_emits_one_event_per_heading(self):
+        splitter = SectionSplitter()
+        events = splitter.feed("## Final Recommendations\nFinal recommendations follow from the analysis above.\n") + splitter.close()
+        self.assertEqual([event["section"] for event in events if event["type"] == "section"], ["Final Recommendations"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,9 @@ import tempfile
 import sounddevice as sd
 import wave
 from dotenv import load_dotenv
+from src.memory import get_memory
+from src.playback import play_stream
+from src.vad import record_utterance
 
 load_dotenv()
 client = OpenAI()
@@ -20,6 +23,10 @@ def transcribe_audio(file_path):
     return transcription
 
 def translator(text, target_language):
+    cached = get_memory().get(text, target_language)
+    if cached is not None:
+        print(f"Translated text (memory): {cached}\n")
+        return cached
     response = client.chat.completions.create(
         model="gpt-4o",
         messages=[
@@ -28,6 +35,7 @@ def translator(text, target_language):
         ]
     )
     translated_text = response.choices[0].message.content.strip()
+    get_memory().put(text, target_language, translated_text)
     print(f"Translated text: {translated_text}\n")
     return translated_text
 
@@ -35,12 +43,14 @@ elevenlabs = ElevenLabs(
   api_key=os.getenv("ELEVENLABS_API_KEY"),
 )
 
+tts_format = "mp3_44100_128"
+
 def tts_voice(text: str):
-    audio_gen = elevenlabs.text_to_speech.convert(
+    audio_gen = elevenlabs.text_to_speech.stream(
         text=text,
         voice_id="JBFqnCBsd6RMkjVDRZzb",
         model_id="eleven_multilingual_v2",
-        output_format="mp3_44100_128",
+        output_format=tts_format,
     )
     
     return audio_gen
@@ -54,19 +64,23 @@ def voice_to_translator(audio_file: str, target_language: str):
     
     os.remove(audio_file)  # Clean up the audio file after processing
     
-    # Save audio to file
-    with open("output_audio.wav", "wb") as f:
-        for chunk in translated_audio:
-            f.write(chunk) 
+    # Play the MP3 as it streams in instead of saving it
+    stats = play_stream(translated_audio, tts_format)
+    if stats["time_to_first_audio"] is not None:
+        print(f"Time to first audio: {stats['time_to_first_audio']:.2f}s")
 
 # -------------------------------------------------------------------            
 samplerate = 16000
 channels = 1
-duration = 10 # seconds to record
+duration = None # seconds to record; None records until you stop speaking
 def record_audio(filename, duration=duration, samplerate=samplerate, channels=channels):
-    print(f"Recording for {duration} seconds...")
-    audio = sd.rec(int(duration * samplerate), samplerate=samplerate, channels=channels, dtype='int16')
-    sd.wait()
+    if duration is None:
+        print("Listening... (stops when you stop speaking)")
+        audio = record_utterance(samplerate)
+    else:
+        print(f"Recording for {duration} seconds...")
+        audio = sd.rec(int(duration * samplerate), samplerate=samplerate, channels=channels, dtype='int16')
+        sd.wait()
     # Save as WAV
     with wave.open(filename, 'wb') as wf:
         wf.setnchannels(channels)
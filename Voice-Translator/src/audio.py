@@ -0,0 +1,33 @@
+import io
+import wave
+
+try:
+    import soundfile
+except ImportError:  # Optional; only needed for FLAC uploads
+    soundfile = None
+
+def encode_wav(samples, samplerate, channels=1):
+    """
+    16-bit PCM WAV bytes for an int16 numpy buffer, built in memory.
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)  # 16 bits
+        wf.setframerate(samplerate)
+        wf.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+def encode_audio(samples, samplerate, audio_format="wav"):
+    """
+    Encode an int16 numpy buffer for upload. Returns (filename, bytes, mime type),
+    the file tuple the OpenAI SDK accepts. "flac" is lossless and about half
+    the size of WAV for speech, but needs the soundfile package.
+    """
+    if audio_format == "flac":
+        if soundfile is None:
+            raise RuntimeError("FLAC encoding needs the soundfile package (pip install soundfile)")
+        buffer = io.BytesIO()
+        soundfile.write(buffer, samples, samplerate, format="FLAC", subtype="PCM_16")
+        return "audio.flac", buffer.getvalue(), "audio/flac"
+    return "audio.wav", encode_wav(samples, samplerate), "audio/wav"
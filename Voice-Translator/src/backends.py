@@ -0,0 +1,261 @@
+from functools import lru_cache
+import os
+import threading
+
+import numpy as np
+
+from src.audio import encode_wav
+from src.trace import stage, traced_chunks
+
+# Each stage picks its backend independently, e.g. VT_ASR_BACKEND=faster-whisper
+# with the default remote MT and TTS. Local backends import their packages on first use.
+asr_backend = os.getenv("VT_ASR_BACKEND", "openai")
+mt_backend = os.getenv("VT_MT_BACKEND", "openai")
+tts_backend = os.getenv("VT_TTS_BACKEND", "elevenlabs")
+
+# --- Speech recognition ---
+class OpenAIASR:
+    name = "openai"
+
+    def transcribe(self, samples, samplerate):
+        from src.transcribe import transcribe_pcm
+        return transcribe_pcm(samples, samplerate).strip()
+
+    def transcribe_file(self, path):
+        from src.transcribe import transcribe_audio
+        return transcribe_audio(path).strip()
+
+    def transcribe_with_language(self, samples, samplerate):
+        """
+        (text, spoken language code or None); the transcription endpoint doesn't report the language.
+        """
+        return self.transcribe(samples, samplerate), None
+
+class FasterWhisperASR:
+    """
+    Local Whisper on the CPU through faster-whisper (CTranslate2), int8 by default.
+    """
+    name = "faster-whisper"
+
+    def __init__(self, model_size=os.getenv("WHISPER_MODEL", "small"), device="cpu", compute_type="int8"):
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(model_size, device=device, compute_type=compute_type)
+
+    def _text(self, audio):
+        # Greedy decoding: beam search costs several times the latency for little gain on short utterances
+        segments, info = self.model.transcribe(audio, beam_size=1)
+        return " ".join(segment.text.strip() for segment in segments).strip(), info.language
+
+    def transcribe(self, samples, samplerate):
+        return self.transcribe_with_language(samples, samplerate)[0]
+
+    def transcribe_with_language(self, samples, samplerate):
+        """
+        (text, spoken language code), the language as Whisper detected it, e.g. "fr".
+        """
+        audio = samples.reshape(-1).astype(np.float32) / 32768.0
+        if samplerate != 16000:
+            # Whisper expects 16 kHz; linear interpolation is enough for speech
+            positions = np.arange(0, len(audio), samplerate / 16000)
+            audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+        with stage("asr"):
+            return self._text(audio)
+
+    def transcribe_file(self, path):
+        with stage("asr"):
+            return self._text(path)[0]
+
+# --- Translation ---
+class OpenAIMT:
+    name = "openai"
+
+    def translate(self, text, target_language, source_language=None):
+        # The model works out the source language itself
+        from src.translator import translator
+        with stage("mt"):
+            return translator(text, target_language)
+
+    def translate_between(self, text, language_a, language_b, last_target=None, source_language=None):
+        """
+        Translate text from whichever of the two languages it is in into the
+        other. Returns (target language, translation). source_language, when
+        the ASR detected it, saves identifying the language in the request.
+        """
+        from src.translator import translate_between, translator
+        with stage("mt"):
+            target_language = other_language(source_language, language_a, language_b)
+            if target_language is not None:
+                return target_language, translator(text, target_language)
+            return translate_between(text, language_a, language_b, last_target=last_target)
+
+# Language names as the user types them, mapped to the ISO 639-1 codes local MT models use
+language_codes = {
+    "arabic": "ar", "chinese": "zh", "dutch": "nl", "english": "en", "french": "fr", "german": "de",
+    "hindi": "hi", "italian": "it", "japanese": "ja", "korean": "ko", "polish": "pl", "portuguese": "pt",
+    "russian": "ru", "spanish": "es", "swedish": "sv", "turkish": "tr", "ukrainian": "uk", "bengali": "bn",
+}
+
+def language_code(language):
+    language = language.strip().lower()
+    return language_codes.get(language, language)
+
+def other_language(spoken, language_a, language_b):
+    """
+    The language to translate into when spoken (a name or code) is one of the
+    two conversation languages, else None.
+    """
+    if not spoken:
+        return None
+    code = language_code(spoken)
+    if code == language_code(language_a):
+        return language_b
+    if code == language_code(language_b):
+        return language_a
+    return None
+
+class ArgosMT:
+    """
+    Offline translation with Argos Translate (CTranslate2 OpenNMT models).
+    The source-to-target language packages must be installed beforehand.
+    Argos can't detect the source language: it is passed per call, and
+    VT_SOURCE_LANGUAGE is the default.
+    """
+    name = "argos"
+
+    def __init__(self, source_language=os.getenv("VT_SOURCE_LANGUAGE", "en")):
+        import argostranslate.translate
+        self._translate = argostranslate.translate.translate
+        self.source_code = language_code(source_language)
+
+    def translate(self, text, target_language, source_language=None):
+        with stage("mt"):
+            return self._translate_cached(text, target_language, source_language)
+
+    def translate_between(self, text, language_a, language_b, last_target=None, source_language=None):
+        """
+        Translate text into the other of the two languages. The spoken language
+        comes from the ASR (source_language); without it, the last listener is
+        assumed to be answering. Returns (target language, translation).
+        """
+        target_language = other_language(source_language, language_a, language_b)
+        if target_language is None:
+            target_language = language_b if last_target in (None, language_a) else language_a
+        source_language = language_b if target_language == language_a else language_a
+        with stage("mt"):
+            # Exact memory matches only, as in OpenAIMT.translate_between
+            return target_language, self._translate_cached(text, target_language, source_language, fuzzy=False)
+
+    def _translate_cached(self, text, target_language, source_language=None, fuzzy=True):
+        from src.memory import get_memory
+        source_code = language_code(source_language) if source_language else self.source_code
+        if source_code == language_code(target_language):
+            return text
+        memory = get_memory()
+        cached = memory.get(text, target_language, fuzzy=fuzzy)
+        if cached is not None:
+            return cached
+        translated_text = self._translate(text, source_code, language_code(target_language)).strip()
+        memory.put(text, target_language, translated_text)
+        return translated_text
+
+# --- Speech synthesis ---
+class ElevenLabsTTS:
+    name = "elevenlabs"
+
+    @property
+    def samplerate(self):
+        from src.tts import pcm_samplerate
+        return pcm_samplerate
+
+    def stream(self, text, output_format=None, language=None):
+        """
+        Returns (output format, chunk iterator). The multilingual voice speaks every language.
+        """
+        from src.tts import stream_tts
+        output_format = output_format or f"pcm_{self.samplerate}"
+        return output_format, traced_chunks(stream_tts(text, output_format))
+
+    def synthesize_file(self, text, language=None):
+        """
+        Returns (file bytes, extension).
+        """
+        from src.tts import mp3_format, synthesize
+        return synthesize(text, mp3_format), ".mp3"
+
+class PiperTTS:
+    """
+    Local neural TTS with Piper (ONNX, real time on a CPU core). A Piper voice
+    speaks one language: PIPER_VOICE_<code> (e.g. PIPER_VOICE_FR) points at
+    the .onnx voice for that language, and PIPER_VOICE at the one used for
+    any other language. Voices load on first use. Always produces PCM, at the
+    default voice's sample rate.
+    """
+    name = "piper"
+
+    def __init__(self, model_path=os.getenv("PIPER_VOICE")):
+        voices = {name[len("PIPER_VOICE_"):].lower(): path for name, path in os.environ.items() if name.startswith("PIPER_VOICE_") and path}
+        if not model_path and not voices:
+            raise RuntimeError("Set PIPER_VOICE (or PIPER_VOICE_<language code>) to a Piper .onnx voice model to use local TTS")
+        self.model_paths = voices
+        self.fallback_path = model_path
+        self.default_path = model_path or next(iter(voices.values()))
+        self._voices = {}
+        self._lock = threading.Lock()
+        self.samplerate = self._voice(None).config.sample_rate
+
+    def _voice(self, language):
+        path = self.model_paths.get(language_code(language)) if language else None
+        if path is None:
+            if language and not self.fallback_path:
+                raise RuntimeError(f"No Piper voice for {language}; set PIPER_VOICE_{language_code(language).upper()}")
+            path = self.default_path
+        with self._lock:
+            if path not in self._voices:
+                from piper import PiperVoice
+                self._voices[path] = PiperVoice.load(path)
+            return self._voices[path]
+
+    def _chunks(self, text, language=None):
+        voice = self._voice(language)
+        if hasattr(voice, "synthesize_stream_raw"):
+            chunks = voice.synthesize_stream_raw(text)  # piper-tts < 1.3
+        else:
+            chunks = (chunk.audio_int16_bytes for chunk in voice.synthesize(text))
+        rate = voice.config.sample_rate
+        for chunk in chunks:
+            if rate != self.samplerate:
+                # Voices of another quality level run at another rate; linear interpolation is enough for speech
+                samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+                positions = np.arange(0, len(samples), rate / self.samplerate)
+                chunk = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16).tobytes()
+            yield chunk
+
+    def stream(self, text, output_format=None, language=None):
+        # Piper only produces PCM; callers get the format actually used
+        return f"pcm_{self.samplerate}", traced_chunks(self._chunks(text, language))
+
+    def synthesize_file(self, text, language=None):
+        samples = np.frombuffer(b"".join(self._chunks(text, language)), dtype=np.int16)
+        return encode_wav(samples, self.samplerate), ".wav"
+
+asr_backends = {"openai": OpenAIASR, "faster-whisper": FasterWhisperASR}
+mt_backends = {"openai": OpenAIMT, "argos": ArgosMT}
+tts_backends = {"elevenlabs": ElevenLabsTTS, "piper": PiperTTS}
+
+def _create(backends, name, stage):
+    if name not in backends:
+        raise ValueError(f"Unknown {stage} backend {name!r}; choose from {', '.join(backends)}")
+    return backends[name]()
+
+# Models are loaded once per process and shared
+@lru_cache(maxsize=None)
+def get_asr(name=None):
+    return _create(asr_backends, name or asr_backend, "ASR")
+
+@lru_cache(maxsize=None)
+def get_mt(name=None):
+    return _create(mt_backends, name or mt_backend, "MT")
+
+@lru_cache(maxsize=None)
+def get_tts(name=None):
+    return _create(tts_backends, name or tts_backend, "TTS")
@@ -0,0 +1,210 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import re
+import threading
+import time
+
+from src.backends import get_asr, get_mt, get_tts
+from src.translator import translate_batch
+
+# Formats the transcription endpoint accepts
+audio_extensions = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".webm", ".mp4", ".mpeg", ".mpga")
+short_chars = 500        # transcripts up to this long are grouped into one translation request
+max_batch_chars = 4000
+max_batch_items = 20
+
+def list_audio_files(directory):
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(audio_extensions)
+    )
+
+def language_slug(language):
+    return re.sub(r"[^a-z0-9]+", "-", language.lower()).strip("-")
+
+def translation_batches(items, short_chars=short_chars, max_batch_chars=max_batch_chars, max_batch_items=max_batch_items):
+    """
+    Group (key, text) items into lists for translate_batch: short texts share
+    a request up to max_batch_chars / max_batch_items; long texts go alone.
+    """
+    batches, current, size = [], [], 0
+    for key, text in items:
+        if len(text) > short_chars:
+            batches.append([(key, text)])
+            continue
+        if current and (size + len(text) > max_batch_chars or len(current) >= max_batch_items):
+            batches.append(current)
+            current, size = [], 0
+        current.append((key, text))
+        size += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+def completed(manifest_path):
+    """
+    (source, language) pairs already translated in an earlier run, and the
+    transcripts it produced, so a rerun resumes where it stopped.
+    """
+    done, transcripts = set(), {}
+    if not os.path.exists(manifest_path):
+        return done, transcripts
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial last line from an interrupted run
+            if record.get("transcript") is not None:
+                transcripts[record["source"]] = record["transcript"]
+            if record.get("status") == "ok":
+                done.add((record["source"], record["language"]))
+    return done, transcripts
+
+def run_batch(input_dir, languages, output_dir="translated", asr_workers=4, mt_workers=4, tts_workers=4):
+    """
+    Transcribe every audio file in input_dir once, translate the transcripts
+    into each language (short ones several per request) and synthesise the
+    translations, each stage on its own bounded thread pool. Writes
+    <output_dir>/<language>/<file name>.txt and .mp3 (.wav with local TTS), e.g.
+    a.wav.txt, so a.wav and a.mp3 don't overwrite each other, and appends one record per
+    (file, language) to <output_dir>/manifest.jsonl with per-stage timings.
+    A file that fails at any stage gets an error record and the batch goes on.
+    Returns the wall-clock seconds of each stage.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, "manifest.jsonl")
+    done, transcripts = completed(manifest_path)
+    files = [path for path in list_audio_files(input_dir) if any((path, language) not in done for language in languages)]
+    print(f"{len(files)} files to translate into {', '.join(languages)}")
+    stage_seconds = {}
+    asr, mt, tts = get_asr(), get_mt(), get_tts()
+    asr_seconds, mt_seconds = {}, {}
+    errors = {}
+
+    # Stage 1: transcription, once per file
+    start = time.perf_counter()
+
+    def transcribe(path):
+        if path in transcripts:
+            return
+        started = time.perf_counter()
+        try:
+            transcripts[path] = asr.transcribe_file(path)
+        except Exception as e:
+            errors[path] = f"transcription: {type(e).__name__}: {e}"
+        asr_seconds[path] = round(time.perf_counter() - started, 3)
+
+    with ThreadPoolExecutor(max_workers=asr_workers) as pool:
+        list(pool.map(transcribe, files))
+    stage_seconds["asr"] = time.perf_counter() - start
+
+    # Stage 2: translation, short transcripts batched per language
+    start = time.perf_counter()
+    translations = {}
+    jobs = []
+    for language in languages:
+        items = [(path, transcripts[path]) for path in files if transcripts.get(path) and (path, language) not in done]
+        if mt.name == "openai":
+            jobs += [(language, batch) for batch in translation_batches(items)]
+        else:
+            # Local models translate one text at a time
+            jobs += [(language, [item]) for item in items]
+
+    def translate(job):
+        language, batch = job
+        started = time.perf_counter()
+        try:
+            if len(batch) == 1:
+                results = [mt.translate(batch[0][1], language)]
+            else:
+                results = translate_batch([text for _, text in batch], language)
+        except Exception as e:
+            if len(batch) > 1:
+                # One bad transcript must not fail the others it was batched with
+                for item in batch:
+                    translate((language, [item]))
+                return
+            errors[(batch[0][0], language)] = f"translation: {type(e).__name__}: {e}"
+            return
+        # A batched request's time is shared between the files in it
+        seconds = round((time.perf_counter() - started) / len(batch), 3)
+        for (path, _), translated_text in zip(batch, results):
+            translations[(path, language)] = translated_text
+            mt_seconds[(path, language)] = seconds
+
+    with ThreadPoolExecutor(max_workers=mt_workers) as pool:
+        list(pool.map(translate, jobs))
+    stage_seconds["mt"] = time.perf_counter() - start
+
+    # Stage 3: speech synthesis and outputs, one manifest line per (file, language)
+    start = time.perf_counter()
+    manifest_lock = threading.Lock()
+
+    with open(manifest_path, "a", encoding="utf-8") as manifest:
+        def write(record):
+            with manifest_lock:
+                manifest.write(json.dumps(record, ensure_ascii=False) + "\n")
+                manifest.flush()
+                os.fsync(manifest.fileno())
+
+        def speak(key):
+            try:
+                write(synthesise(key))
+            except Exception as e:
+                # e.g. the manifest line itself couldn't be written; report it and go on with the other files
+                print(f"{key[0]} ({key[1]}): {type(e).__name__}: {e}")
+
+        def synthesise(key):
+            path, language = key
+            record = {"source": path, "language": language, "transcript": transcripts.get(path)}
+            timings = {"asr": asr_seconds.get(path), "mt": mt_seconds.get(key), "tts": None}
+            error = errors.get(path) or errors.get(key)
+            if error is None and not transcripts.get(path):
+                error = "no speech in recording"
+            if error is None and key not in translations:
+                error = "translation: no translation returned"
+            if error is None:
+                # The source extension stays in the name, so a.wav and a.mp3 get separate outputs
+                name = os.path.basename(path)
+                language_dir = os.path.join(output_dir, language_slug(language))
+                started = time.perf_counter()
+                try:
+                    os.makedirs(language_dir, exist_ok=True)
+                    with open(os.path.join(language_dir, name + ".txt"), "w", encoding="utf-8") as f:
+                        f.write(translations[key])
+                    data, extension = tts.synthesize_file(translations[key], language)
+                    audio_path = os.path.join(language_dir, name + extension)
+                    with open(audio_path, "wb") as f:
+                        f.write(data)
+                    record.update({"status": "ok", "translation": translations[key], "audio": audio_path})
+                except Exception as e:
+                    error = f"tts: {type(e).__name__}: {e}"
+                timings["tts"] = round(time.perf_counter() - started, 3)
+            if error is not None:
+                record.update({"status": "error", "error": error})
+            record["timings"] = timings
+            return record
+
+        keys = [(path, language) for path in files for language in languages if (path, language) not in done]
+        with ThreadPoolExecutor(max_workers=tts_workers) as pool:
+            list(pool.map(speak, keys))
+    stage_seconds["tts"] = time.perf_counter() - start
+    return stage_seconds
+
+def main():
+    parser = argparse.ArgumentParser(description="Translate a directory of recordings into one or more languages.")
+    parser.add_argument("input_dir")
+    parser.add_argument("languages", nargs="+", help="Target languages, e.g. French Spanish")
+    parser.add_argument("--output", default="translated")
+    parser.add_argument("--asr-workers", type=int, default=4)
+    parser.add_argument("--mt-workers", type=int, default=4)
+    parser.add_argument("--tts-workers", type=int, default=4)
+    args = parser.parse_args()
+    stage_seconds = run_batch(args.input_dir, args.languages, args.output, args.asr_workers, args.mt_workers, args.tts_workers)
+    print("Stage times: " + ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in stage_seconds.items()))
+
+if __name__ == "__main__":
+    main()
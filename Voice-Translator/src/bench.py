@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import time
+import wave
+
+import numpy as np
+
+from src.backends import asr_backends, get_asr, get_mt, get_tts, mt_backends, tts_backends
+from src.memory import open_memory
+from src.playback import parse_output_format
+
+def read_wav(path):
+    """
+    (int16 mono samples, samplerate) of a 16-bit WAV fixture.
+    """
+    with wave.open(path, "rb") as wf:
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        if wf.getnchannels() > 1:
+            samples = samples.reshape(-1, wf.getnchannels())[:, 0].copy()
+        return samples, wf.getframerate()
+
+def list_fixtures(directory):
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.lower().endswith(".wav"))
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def summarise(latencies, rtfs=None):
+    summary = {
+        "runs": len(latencies),
+        "mean_s": sum(latencies) / len(latencies) if latencies else None,
+        "p50_s": percentile(latencies, 0.5),
+        "p95_s": percentile(latencies, 0.95),
+    }
+    if rtfs:
+        # Real-time factor: processing time / audio duration; below 1 is faster than real time
+        summary["rtf"] = sum(rtfs) / len(rtfs)
+    return summary
+
+def bench_asr(name, fixtures, repeat=1):
+    asr = get_asr(name)  # Model loading is not part of the measurement
+    latencies, rtfs, transcripts = [], [], {}
+    for path in fixtures:
+        samples, samplerate = read_wav(path)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            transcripts[path] = asr.transcribe(samples, samplerate)
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            rtfs.append(elapsed / (len(samples) / samplerate))
+    return summarise(latencies, rtfs), transcripts
+
+def bench_mt(name, texts, target_language, repeat=1):
+    mt = get_mt(name)
+    latencies = []
+    for text in texts:
+        for _ in range(repeat):
+            open_memory(":memory:")  # Every run pays for a real translation
+            start = time.perf_counter()
+            mt.translate(text, target_language)
+            latencies.append(time.perf_counter() - start)
+    return summarise(latencies)
+
+def bench_tts(name, texts, repeat=1, language=None):
+    tts = get_tts(name)
+    latencies, first_chunk, rtfs = [], [], []
+    for text in texts:
+        for _ in range(repeat):
+            open_memory(":memory:")  # No cached audio
+            start = time.perf_counter()
+            output_format, chunks = tts.stream(text, language=language)
+            size, first = 0, None
+            for chunk in chunks:
+                if first is None:
+                    first = time.perf_counter() - start
+                size += len(chunk)
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            if first is not None:
+                first_chunk.append(first)
+            codec, samplerate = parse_output_format(output_format)
+            if codec == "pcm" and size:
+                rtfs.append(elapsed / (size / 2 / samplerate))
+    summary = summarise(latencies, rtfs)
+    summary["first_chunk_p50_s"] = percentile(first_chunk, 0.5)
+    summary["first_chunk_p95_s"] = percentile(first_chunk, 0.95)
+    return summary
+
+def _names(value, available):
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    for name in names:
+        if name not in available:
+            raise SystemExit(f"Unknown backend {name!r}; choose from {', '.join(available)}")
+    return names
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare speech backends on recorded WAV fixtures: latency and real-time factor per stage.")
+    parser.add_argument("fixtures", help="directory of 16-bit WAV recordings")
+    parser.add_argument("--asr", default="openai", help=f"comma-separated: {', '.join(asr_backends)}")
+    parser.add_argument("--mt", default="openai", help=f"comma-separated: {', '.join(mt_backends)}")
+    parser.add_argument("--tts", default="elevenlabs", help=f"comma-separated: {', '.join(tts_backends)}")
+    parser.add_argument("--language", default="French")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    fixtures = list_fixtures(args.fixtures)
+    if not fixtures:
+        raise SystemExit(f"No .wav fixtures in {args.fixtures}")
+    results = {"asr": {}, "mt": {}, "tts": {}}
+    texts = None
+    for name in _names(args.asr, asr_backends):
+        results["asr"][name], transcripts = bench_asr(name, fixtures, args.repeat)
+        # The first backend's transcripts feed the MT benchmark
+        texts = texts or [text for text in transcripts.values() if text]
+    mt_names, tts_names = _names(args.mt, mt_backends), _names(args.tts, tts_backends)
+    # Each stage benchmarks the previous stage's output, so an empty stage skips the ones after it
+    if texts is None and mt_names:
+        print("Skipping MT: it translates the ASR transcripts, and --asr is empty")
+        mt_names = []
+    translations = None
+    for name in mt_names:
+        results["mt"][name] = bench_mt(name, texts, args.language, args.repeat)
+        translations = translations or [get_mt(name).translate(text, args.language) for text in texts]
+    if translations is None and tts_names:
+        print("Skipping TTS: it speaks the MT translations, and --mt is empty")
+        tts_names = []
+    for name in tts_names:
+        results["tts"][name] = bench_tts(name, translations, args.repeat, args.language)
+
+    for stage, backends in results.items():
+        for name, summary in backends.items():
+            print(f"{stage:<4} {name:<15} " + "  ".join(
+                f"{key} {value:.3f}" for key, value in summary.items() if isinstance(value, float)
+            ) + f"  runs {summary['runs']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
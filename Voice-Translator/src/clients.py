@@ -0,0 +1,16 @@
+from functools import lru_cache
+from dotenv import load_dotenv
+from openai import DefaultHttpxClient, OpenAI
+import httpx
+
+load_dotenv()
+
+@lru_cache(maxsize=None)
+def openai_client():
+    """
+    One OpenAI client per process. Its connection pool keeps TLS connections to
+    the API alive between utterances instead of handshaking on every call.
+    """
+    return OpenAI(http_client=DefaultHttpxClient(
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=120),
+    ))
@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import time
+
+from src.backends import get_asr, get_mt, get_tts
+from src.trace import activate, current_trace
+from src.tts import mp3_format
+
+def fan_out(text, languages, output_format=mp3_format):
+    """
+    Translate text into every language at once and synthesise each
+    translation as soon as it is ready, one thread per language. Yields events
+    in the order they happen, so each language's audio can be streamed
+    without waiting for the others:
+    {"type": "translation", "language", "text", "seconds"}
+    {"type": "audio", "language", "format", "data"} for each audio chunk
+    {"type": "done", "language", "first_audio", "seconds"}
+    {"type": "error", "language", "error"}
+    Times are seconds since fan_out was called. The calling thread's trace,
+    if any, collects every language's stages.
+    """
+    events = queue.Queue()
+    started = time.monotonic()
+    mt, tts = get_mt(), get_tts()
+    trace = current_trace()
+
+    def run(language):
+        with activate(trace):
+            translate_and_speak(language)
+
+    def translate_and_speak(language):
+        try:
+            translated_text = mt.translate(text, language)
+            events.put({"type": "translation", "language": language, "text": translated_text, "seconds": time.monotonic() - started})
+            first_audio = None
+            # Local TTS backends answer in PCM whatever format was asked for
+            audio_format, chunks = tts.stream(translated_text, output_format, language)
+            for chunk in chunks:
+                if first_audio is None:
+                    first_audio = time.monotonic() - started
+                events.put({"type": "audio", "language": language, "format": audio_format, "data": chunk})
+            events.put({"type": "done", "language": language, "first_audio": first_audio, "seconds": time.monotonic() - started})
+        except Exception as e:
+            events.put({"type": "error", "language": language, "error": f"{type(e).__name__}: {e}"})
+
+    with ThreadPoolExecutor(max_workers=max(1, len(languages)), thread_name_prefix="fanout") as pool:
+        for language in languages:
+            pool.submit(run, language)
+        remaining = len(languages)
+        while remaining:
+            event = events.get()
+            if event["type"] in ("done", "error"):
+                remaining -= 1
+            yield event
+
+def fan_out_speech(samples, samplerate, languages, output_format=mp3_format):
+    """
+    Transcribe a recording once, then fan_out the transcript.
+    Yields {"type": "transcript", "text"} first, then fan_out's events.
+    """
+    text = get_asr().transcribe(samples, samplerate)
+    yield {"type": "transcript", "text": text}
+    if text:
+        yield from fan_out(text, languages, output_format)
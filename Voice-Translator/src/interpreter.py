@@ -0,0 +1,163 @@
+from collections import deque
+import queue
+import threading
+import time
+
+import sounddevice as sd
+
+from src.backends import get_asr, get_mt, get_tts
+from src.playback import Player, echo_tail_ms
+from src.trace import Trace, activate, format_trace
+from src.vad import VoiceActivityDetector, frame_ms, record_utterance
+
+samplerate = 16000
+channels = 1
+max_pending = 2       # utterances waiting for translation; beyond this the oldest is dropped
+
+class UtteranceQueue:
+    """
+    Recorded utterances waiting for translation. put never blocks, so the
+    microphone is always read. When max_pending utterances are already
+    waiting, the oldest is dropped to make room. Utterances are never
+    merged: consecutive ones may come from different speakers in different
+    languages, and each is translated on its own.
+    """
+
+    def __init__(self, max_pending=max_pending):
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._items = deque()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def put(self, samples, trace):
+        """
+        Returns "queued", or "dropped" when an older utterance was dropped to make room.
+        """
+        status = "queued"
+        with self._condition:
+            if len(self._items) >= self.max_pending:
+                self._items.popleft()
+                self.dropped += 1
+                status = "dropped"
+            self._items.append({"samples": samples, "trace": trace, "queued_at": time.monotonic()})
+            self._condition.notify()
+        return status
+
+    def get(self):
+        """
+        The oldest waiting utterance, or None once closed and empty.
+        Time spent waiting is recorded as the utterance's queue stage.
+        """
+        with self._condition:
+            while not self._items and not self._closed:
+                self._condition.wait()
+            if not self._items:
+                return None
+            item = self._items.popleft()
+        item["trace"].add("queue", item["queued_at"], time.monotonic())
+        return item
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+def interpret(language_a, language_b, stop=None):
+    """
+    Two-way interpreter that runs until stop is set. One microphone stream
+    and one output stream stay open for the whole conversation. A listener
+    thread records each utterance into an UtteranceQueue. A translation
+    thread transcribes it and translates it into the other speaker's
+    language. A speaker thread plays the translation while the next
+    utterance is already being processed. The microphone is muted while
+    translated speech plays, so it isn't translated back.
+    Returns {"utterances", "dropped"}.
+    """
+    stop = stop or threading.Event()
+    asr, mt, tts = get_asr(), get_mt(), get_tts()
+    utterances = UtteranceQueue()
+    # Bounded too: when playback falls behind, translation waits and the backlog builds up in utterances
+    translations = queue.Queue(maxsize=max_pending)
+    speaking = threading.Event()
+    # Calibrated once on the room noise and shared by every utterance
+    detector = VoiceActivityDetector(samplerate)
+    spoken = []
+
+    def listen(stream):
+        try:
+            while not stop.is_set():
+                trace = Trace(mode="interpreter", languages=[language_a, language_b])
+                with activate(trace):
+                    samples = record_utterance(samplerate, detector=detector, stream=stream, mute=speaking, stop=stop)
+                if len(samples) and utterances.put(samples, trace) == "dropped":
+                    print("(translation is falling behind: the oldest waiting utterance was dropped)")
+        finally:
+            utterances.close()
+
+    def translate_worker():
+        target_language = None
+        try:
+            while (item := utterances.get()) is not None:
+                trace = item["trace"]
+                try:
+                    with activate(trace):
+                        text, detected = asr.transcribe_with_language(item["samples"], samplerate)
+                        if not text:
+                            continue
+                        target_language, translated_text = mt.translate_between(
+                            text, language_a, language_b, last_target=target_language, source_language=detected
+                        )
+                except Exception as e:
+                    print(f"Translation failed: {type(e).__name__}: {e}")
+                    continue
+                trace.meta["target_language"] = target_language
+                print(f"{text}\n  -> {target_language}: {translated_text}")
+                translations.put((trace, target_language, translated_text))
+        finally:
+            translations.put(None)
+
+    def speak_worker(player):
+        while (item := translations.get()) is not None:
+            trace, language, text = item
+            player.mark()
+            try:
+                with activate(trace):
+                    _, chunks = tts.stream(text, language=language)
+                    for chunk in chunks:
+                        speaking.set()
+                        player.write(chunk)
+                player.finish()
+                player.wait()
+                time.sleep(echo_tail_ms / 1000)
+            except Exception as e:
+                player.finish()
+                print(f"Speech failed: {type(e).__name__}: {e}")
+            finally:
+                speaking.clear()
+            if player.first_audio_at is not None:
+                trace.mark("first_audio", player.first_audio_at)
+            print(format_trace(trace))
+            trace.write()
+            spoken.append(trace)
+
+    frame_len = int(samplerate * frame_ms / 1000)
+    with Player(tts.samplerate) as player, \
+            sd.InputStream(samplerate=samplerate, channels=channels, dtype="int16", blocksize=frame_len) as stream:
+        workers = [
+            threading.Thread(target=listen, args=(stream,), daemon=True),
+            threading.Thread(target=translate_worker, daemon=True),
+            threading.Thread(target=speak_worker, args=(player,), daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            while any(worker.is_alive() for worker in workers):
+                for worker in workers:
+                    worker.join(timeout=0.5)
+        except KeyboardInterrupt:
+            # Finish what was already said, then stop; a second Ctrl+C quits at once
+            stop.set()
+            for worker in workers:
+                worker.join()
+    return {"utterances": len(spoken), "dropped": utterances.dropped}
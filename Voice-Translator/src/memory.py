@@ -0,0 +1,169 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Translations and synthesised audio survive restarts in one SQLite file
+memory_path = os.getenv("TRANSLATION_MEMORY_PATH", "translation_memory.sqlite3")
+max_translations = 20000
+max_audio_bytes = 200 * 1024 * 1024
+
+def normalise(text):
+    """
+    Case, whitespace and surrounding punctuation don't change a translation lookup.
+    """
+    text = " ".join(text.lower().split())
+    return re.sub(r"^[^\w]+|[^\w]+$", "", text)
+
+def _loose(text):
+    # Punctuation inside the text goes too, except within numbers: "12.5" is not "125"
+    text = re.sub(r"(?<!\d)[^\w\s]|[^\w\s](?!\d)", " ", text)
+    return " ".join(text.split())
+
+class TranslationMemory:
+    """
+    Translation memory keyed by (normalised source text, target language),
+    with an optional loose lookup that also ignores punctuation inside the
+    text, plus a cache of TTS audio
+    per (text, voice, model, format). Both tables evict least recently used
+    entries beyond their limits. Safe to share between threads.
+    """
+
+    def __init__(self, path=memory_path, max_translations=max_translations, max_audio_bytes=max_audio_bytes):
+        self.max_translations = max_translations
+        self.max_audio_bytes = max_audio_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS translations (
+                source_norm TEXT NOT NULL,
+                target_language TEXT NOT NULL,
+                source TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (source_norm, target_language)
+            );
+            CREATE INDEX IF NOT EXISTS translations_by_length ON translations (target_language, length);
+            CREATE INDEX IF NOT EXISTS translations_by_use ON translations (last_used);
+            CREATE TABLE IF NOT EXISTS audio (
+                key TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS audio_by_use ON audio (last_used);
+        """)
+
+    # --- Translations ---
+    def get(self, text, target_language, fuzzy=False):
+        """
+        Cached translation of text, or None. Only the normalised text has to
+        match. With fuzzy, a stored phrasing that differs only in punctuation
+        also matches ("Yes, please" and "Yes please"); any different word, even
+        "not", is a miss.
+        """
+        key, language = normalise(text), target_language.strip().lower()
+        if not key:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT source_norm, translation FROM translations WHERE source_norm = ? AND target_language = ?",
+                (key, language),
+            ).fetchone()
+            if row is None and fuzzy:
+                row = self._closest(key, language)
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE translations SET last_used = ?, hits = hits + 1 WHERE source_norm = ? AND target_language = ?",
+                (time.time(), row[0], language),
+            )
+            self._db.commit()
+            return row[1]
+
+    def _closest(self, key, language):
+        # Only punctuation differs, so the stored text is at most a few characters longer or shorter
+        loose = _loose(key)
+        slack = max(4, len(key) // 5)
+        candidates = self._db.execute(
+            "SELECT source_norm, translation FROM translations WHERE target_language = ? AND length BETWEEN ? AND ? ORDER BY last_used DESC",
+            (language, len(key) - slack, len(key) + slack),
+        ).fetchall()
+        for source_norm, translation in candidates:
+            if _loose(source_norm) == loose:
+                return source_norm, translation
+        return None
+
+    def put(self, text, target_language, translation):
+        key = normalise(text)
+        if not key:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO translations (source_norm, target_language, source, translation, length, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, target_language.strip().lower(), text, translation, len(key), time.time()),
+            )
+            self._db.execute(
+                "DELETE FROM translations WHERE rowid IN (SELECT rowid FROM translations ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_translations,),
+            )
+            self._db.commit()
+
+    # --- TTS audio ---
+    @staticmethod
+    def audio_key(text, voice_id, model_id, output_format):
+        return hashlib.sha256("\0".join((text.strip(), voice_id, model_id, output_format)).encode("utf-8")).hexdigest()
+
+    def get_audio(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT data FROM audio WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE audio SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return row[0]
+
+    def put_audio(self, key, data):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO audio (key, data, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, sqlite3.Binary(data), len(data), time.time()),
+            )
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM audio").fetchone()[0]
+            for old_key, size in self._db.execute("SELECT key, size FROM audio ORDER BY last_used").fetchall():
+                if total <= self.max_audio_bytes:
+                    break
+                self._db.execute("DELETE FROM audio WHERE key = ?", (old_key,))
+                total -= size
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+_memory = None
+_memory_lock = threading.Lock()
+
+def get_memory():
+    """
+    The process-wide translation memory, opened on first use.
+    """
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory()
+        return _memory
+
+def open_memory(path=memory_path):
+    """
+    Switch the process-wide translation memory to another file; ":memory:" gives an empty, throwaway one.
+    """
+    global _memory
+    with _memory_lock:
+        _memory = TranslationMemory(path)
+        return _memory
@@ -0,0 +1,191 @@
+import shutil
+import subprocess
+import threading
+import time
+
+import sounddevice as sd
+
+from src.trace import mark
+
+prebuffer_ms = 200   # audio held back before playback starts, to ride out gaps between network chunks
+blocksize = 1024
+echo_tail_ms = 300   # the microphone stays muted this long after playback drains, for the output latency
+
+def parse_output_format(output_format):
+    """
+    ElevenLabs output formats look like "pcm_22050" or "mp3_44100_128".
+    Returns (codec, samplerate).
+    """
+    codec, samplerate = output_format.split("_")[:2]
+    return codec, int(samplerate)
+
+def decode_mp3(chunks, samplerate=44100, channels=1):
+    """
+    Decode a stream of MP3 chunks to 16-bit PCM as they arrive, using an
+    ffmpeg subprocess. Yields PCM bytes.
+    """
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("Decoding MP3 for playback needs ffmpeg on the PATH; use a pcm_* output format instead")
+    process = subprocess.Popen(
+        ["ffmpeg", "-loglevel", "error", "-fflags", "nobuffer", "-f", "mp3", "-i", "pipe:0",
+         "-f", "s16le", "-ac", str(channels), "-ar", str(samplerate), "pipe:1"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+    )
+    errors = []
+
+    def feed():
+        try:
+            for chunk in chunks:
+                process.stdin.write(chunk)
+                process.stdin.flush()
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            errors.append(e)
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        while data := process.stdout.read1(4096):
+            yield data
+    finally:
+        process.stdout.close()
+        process.wait()
+        feeder.join()
+    if errors:
+        raise errors[0]
+
+class Player:
+    """
+    Plays 16-bit PCM written from any thread through a sounddevice
+    OutputStream. A jitter buffer holds prebuffer_ms of audio before playback
+    starts, and again after an underrun, so a late network chunk causes one
+    pause instead of crackle. The stream can stay open (warm) across
+    utterances; call mark() at the start of each one to time it.
+    """
+
+    def __init__(self, samplerate, channels=1, prebuffer_ms=prebuffer_ms, blocksize=blocksize):
+        self.samplerate = samplerate
+        self.channels = channels
+        self._frame_bytes = 2 * channels
+        self._prebuffer = int(samplerate * prebuffer_ms / 1000) * self._frame_bytes
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._playing = False
+        self._finished = False
+        self._drained = threading.Event()
+        self.underruns = 0
+        self.marked_at = None
+        self.first_audio_at = None
+        self.stream = sd.RawOutputStream(
+            samplerate=samplerate, channels=channels, dtype="int16", blocksize=blocksize, callback=self._callback,
+        )
+
+    def start(self):
+        self.mark()
+        self.stream.start()
+        return self
+
+    def mark(self):
+        """
+        Start timing a new utterance.
+        """
+        with self._lock:
+            self.marked_at = time.monotonic()
+            self.first_audio_at = None
+            self._finished = False
+            self._drained.clear()
+
+    @property
+    def time_to_first_audio(self):
+        if self.marked_at is None or self.first_audio_at is None:
+            return None
+        return self.first_audio_at - self.marked_at
+
+    def write(self, data):
+        with self._lock:
+            self._buffer += data
+
+    def finish(self):
+        """
+        No more audio for this utterance: play what is buffered without waiting to fill the jitter buffer.
+        """
+        with self._lock:
+            self._finished = True
+            if len(self._buffer) < self._frame_bytes:
+                self._drained.set()
+
+    def wait(self, timeout=None):
+        return self._drained.wait(timeout)
+
+    def close(self):
+        self.stream.stop()
+        self.stream.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _callback(self, outdata, frames, time_info, status):
+        need = len(outdata)
+        with self._lock:
+            available = len(self._buffer) - len(self._buffer) % self._frame_bytes
+            if not self._playing and available and (available >= self._prebuffer or self._finished):
+                self._playing = True
+            written = 0
+            if self._playing:
+                written = min(need, available)
+                outdata[:written] = self._buffer[:written]
+                del self._buffer[:written]
+                if written and self.first_audio_at is None:
+                    self.first_audio_at = time.monotonic()
+                if written < need:
+                    self._playing = False
+                    if not self._finished:
+                        self.underruns += 1
+            outdata[written:] = b"\0" * (need - written)
+            if self._finished and len(self._buffer) < self._frame_bytes:
+                self._drained.set()
+
+def play_stream(chunks, output_format, player=None):
+    """
+    Play streamed TTS audio (pcm_* or mp3_*) as it arrives.
+    Uses the given warm player, or opens one for this call.
+    Returns {"time_to_first_audio", "underruns", "seconds"}.
+    """
+    codec, samplerate = parse_output_format(output_format)
+    if codec == "mp3":
+        chunks = decode_mp3(chunks, samplerate)
+    elif codec != "pcm":
+        raise ValueError(f"Can't play {output_format}; use a pcm_* or mp3_* format")
+
+    own_player = player is None
+    if own_player:
+        player = Player(samplerate).start()
+    elif player.samplerate != samplerate:
+        raise ValueError(f"Player runs at {player.samplerate} Hz but the audio is {output_format}")
+    else:
+        player.mark()
+    underruns = player.underruns
+    try:
+        for chunk in chunks:
+            player.write(chunk)
+        player.finish()
+        player.wait()
+    finally:
+        if own_player:
+            player.close()
+    if player.first_audio_at is not None:
+        mark("first_audio", player.first_audio_at)
+    return {
+        "time_to_first_audio": player.time_to_first_audio,
+        "underruns": player.underruns - underruns,
+        "seconds": time.monotonic() - player.marked_at,
+    }
@@ -0,0 +1,123 @@
+import argparse
+import json
+import sys
+
+from src.backends import get_asr, get_mt, get_tts
+from src.bench import list_fixtures, percentile, read_wav
+from src.memory import open_memory
+from src.playback import parse_output_format, prebuffer_ms
+from src.stub_services import serve
+from src.trace import Trace, activate, mark, stage_order
+from src.vad import trim_silence
+
+def first_playable(chunks, samplerate, prebuffer_ms=prebuffer_ms):
+    """
+    Consume PCM chunks the way Player does without a sound card: audio could
+    start once prebuffer_ms is buffered, or when the stream ends short of it.
+    Marks first_audio at that point on the current trace.
+    """
+    needed = int(samplerate * prebuffer_ms / 1000) * 2
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if size >= needed:
+            mark("first_audio")
+    if size:
+        mark("first_audio")
+    return size
+
+def replay(path, target_language):
+    """
+    Run one recorded utterance through the pipeline (trimmed like a live
+    capture, then ASR, MT and streamed TTS) and return its trace. The
+    recording is not replayed in real time: capture_end is marked at the start.
+    """
+    samples, samplerate = read_wav(path)
+    samples = trim_silence(samples, samplerate=samplerate)
+    open_memory(":memory:")  # Every run pays for a real translation and synthesis
+    trace = Trace(mode="replay", fixture=path, target_language=target_language)
+    with activate(trace):
+        trace.mark("capture_end")
+        text = get_asr().transcribe(samples, samplerate)
+        translated_text = get_mt().translate(text, target_language)
+        output_format, chunks = get_tts().stream(translated_text, language=target_language)
+        first_playable(chunks, parse_output_format(output_format)[1])
+    return trace
+
+def summarise_traces(traces):
+    """
+    Flat {metric: seconds}: time to first audio p50/p95 and each stage's p95.
+    """
+    results = {"runs": len(traces)}
+    ttfa = [trace.time_to_first_audio for trace in traces if trace.time_to_first_audio is not None]
+    results["time_to_first_audio_p50"] = percentile(ttfa, 0.5)
+    results["time_to_first_audio_p95"] = percentile(ttfa, 0.95)
+    names = {name for trace in traces for name in trace.stages}
+    for name in [name for name in stage_order if name in names] + sorted(names - set(stage_order)):
+        results[f"{name}_p95"] = percentile([trace.stages[name]["seconds"] for trace in traces if name in trace.stages], 0.95)
+    return results
+
+def compare(results, baseline, tolerance=0.2, floor_s=0.005):
+    """
+    Metrics more than `tolerance` (a fraction) slower than the baseline.
+    Metrics under floor_s in both runs are too small to time reliably and are skipped.
+    """
+    regressions = {}
+    for metric, before in baseline.items():
+        after = results.get(metric)
+        if metric == "runs" or before is None or after is None or max(before, after) < floor_s:
+            continue
+        if after > before * (1 + tolerance):
+            regressions[metric] = (before, after)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay WAV fixtures through the voice pipeline and report time to first audio.")
+    parser.add_argument("fixtures", help="directory of 16-bit WAV recordings")
+    parser.add_argument("--language", default="French")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs first, so client setup and connections aren't measured")
+    parser.add_argument("--live", action="store_true", help="call the configured services instead of local stubs")
+    parser.add_argument("--asr-delay", type=float, default=0.3, help="stub transcription latency, seconds")
+    parser.add_argument("--mt-delay", type=float, default=0.25, help="stub translation latency, seconds")
+    parser.add_argument("--tts-delay", type=float, default=0.2, help="stub TTS time to first byte, seconds")
+    parser.add_argument("--traces", help="also write every run's trace to this directory")
+    parser.add_argument("--save", help="write the results to this JSON file as a baseline")
+    parser.add_argument("--compare", help="baseline JSON file to check the results against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown per metric, as a fraction")
+    args = parser.parse_args()
+
+    fixtures = list_fixtures(args.fixtures)
+    if not fixtures:
+        raise SystemExit(f"No .wav fixtures in {args.fixtures}")
+    if not args.live:
+        # Must run before the API clients are created
+        serve({"asr": args.asr_delay, "mt": args.mt_delay, "tts_first_byte": args.tts_delay})
+
+    for _ in range(args.warmup):
+        replay(fixtures[0], args.language)
+    traces = []
+    for path in fixtures:
+        for _ in range(args.repeat):
+            traces.append(trace := replay(path, args.language))
+            if args.traces:
+                trace.write(args.traces)
+    results = summarise_traces(traces)
+    for metric, seconds in results.items():
+        if metric != "runs" and seconds is not None:
+            print(f"{metric:<26} {seconds * 1000:10.1f} ms")
+    print(f"{results['runs']} runs")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for metric, (before, after) in regressions.items():
+            print(f"REGRESSION {metric}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+from collections import deque
+import queue
+import re
+import threading
+import time
+
+import numpy as np
+import sounddevice as sd
+
+from src.backends import get_asr, get_mt, get_tts
+from src.playback import Player, echo_tail_ms
+from src.trace import Trace, activate, current_trace
+from src.vad import VoiceActivityDetector, preroll_ms, trim_silence
+
+samplerate = 16000
+channels = 1
+frame_ms = 30
+pause_ms = 400          # a pause this long closes a segment and sends it to transcription
+end_silence_ms = 1500   # this much silence after speech ends the utterance
+max_segment_s = 8       # long runs of speech are cut here so transcription can start
+max_duration_s = 60
+
+# Sentence ends: . ! ? … followed by whitespace, or the CJK full-width forms (no space needed)
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|(?<=[。！？])\s*")
+
+def split_sentences(text):
+    """
+    Split text into (complete sentences, unfinished remainder).
+    """
+    parts = [part for part in SENTENCE_END.split(text.strip()) if part]
+    if not parts:
+        return [], ""
+    if re.search(r"[.!?…。！？]$", parts[-1]):
+        return parts, ""
+    return parts[:-1], parts[-1]
+
+def capture_segments(segments, stop, samplerate=samplerate, detector=None, mute=None):
+    """
+    Read the microphone in frame_ms frames and put each stretch of speech
+    into segments as an int16 array as soon as the speaker pauses.
+    Puts None when the utterance ends (long trailing silence) or stop is set.
+    While the mute event is set, frames are discarded: an open segment is
+    sent as it is, and the trailing silence is counted again from the end of
+    the mute, so translated speech from the speakers is neither recorded nor
+    taken for the end of the utterance.
+    Each segment is a capture stage on the current trace; the first one ending marks capture_end.
+    """
+    detector = detector or VoiceActivityDetector(samplerate)
+    frame_len = int(samplerate * frame_ms / 1000)
+    frames = queue.Queue()
+
+    def callback(indata, frame_count, time_info, status):
+        frames.put(indata[:, 0].copy())
+
+    preroll = deque(maxlen=preroll_ms // frame_ms)
+    segment, silent_ms, heard_speech = [], 0, False
+    started = onset = time.monotonic()
+    trace = current_trace()
+
+    def put_segment(segment):
+        if trace is not None:
+            trace.add("capture", onset, time.monotonic())
+            trace.mark("capture_end")
+        segments.put(trim_silence(np.concatenate(segment), detector, samplerate))
+    try:
+        with sd.InputStream(samplerate=samplerate, channels=channels, dtype="int16", blocksize=frame_len, callback=callback):
+            while not stop.is_set() and time.monotonic() - started < max_duration_s:
+                try:
+                    frame = frames.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if mute is not None and mute.is_set():
+                    if segment:
+                        put_segment(segment)
+                        segment = []
+                    preroll.clear()
+                    silent_ms = 0
+                    continue
+                if detector.is_speech(frame):
+                    if not segment:
+                        segment = list(preroll)
+                        onset = time.monotonic()
+                    heard_speech = True
+                    silent_ms = 0
+                    segment.append(frame)
+                else:
+                    silent_ms += frame_ms
+                    if segment:
+                        segment.append(frame)
+                    else:
+                        preroll.append(frame)
+                if segment and (silent_ms >= pause_ms or len(segment) * frame_ms >= max_segment_s * 1000):
+                    put_segment(segment)
+                    segment = []
+                    preroll.clear()
+                if heard_speech and silent_ms >= end_silence_ms:
+                    break
+        if segment:
+            put_segment(segment)
+    finally:
+        segments.put(None)
+
+def stream_translate(target_language, stop=None, trace=None, speakers=False):
+    """
+    Speech-to-speech translation as a pipeline of threads:
+    microphone segments -> transcription -> translation per complete sentence
+    -> streamed TTS playback. The first sentence is played while later ones
+    are still being transcribed and translated, and the microphone keeps
+    recording meanwhile, which assumes headphones. With speakers=True the
+    microphone is muted while translated speech plays (so it isn't recorded
+    back), and what is said then is lost; the mute is printed.
+    Every thread records its stages on trace (a new Trace if not given).
+    Returns (transcript, translation, seconds from the end of the first
+    segment to the first audio played).
+    """
+    stop = stop or threading.Event()
+    trace = trace or Trace(mode="stream", target_language=target_language)
+    asr, mt, tts = get_asr(), get_mt(), get_tts()
+    segments, sentences, translations = queue.Queue(), queue.Queue(), queue.Queue()
+    speaking = threading.Event()
+    transcript, translated = [], []
+
+    def traced(target):
+        def run(*args):
+            with activate(trace):
+                target(*args)
+        return run
+
+    # Each stage always passes None downstream, even on error, so the pipeline drains
+    def asr_worker():
+        pending = ""
+        try:
+            while (samples := segments.get()) is not None:
+                if not len(samples):
+                    continue
+                text = asr.transcribe(samples, samplerate)
+                if not text:
+                    continue
+                transcript.append(text)
+                complete, pending = split_sentences(f"{pending} {text}")
+                for sentence in complete:
+                    sentences.put(sentence)
+            if pending.strip():
+                sentences.put(pending.strip())
+        finally:
+            stop.set()
+            sentences.put(None)
+
+    def mt_worker():
+        try:
+            while (sentence := sentences.get()) is not None:
+                translated_sentence = mt.translate(sentence, target_language)
+                print(f"Translated: {translated_sentence}")
+                translated.append(translated_sentence)
+                translations.put(translated_sentence)
+        finally:
+            translations.put(None)
+
+    def mute():
+        if not speaking.is_set():
+            speaking.set()
+            print("(microphone muted while the translation plays)")
+
+    def unmute(player):
+        # Let the speakers drain, wait out the echo, then listen again
+        player.finish()
+        player.wait()
+        time.sleep(echo_tail_ms / 1000)
+        if player.first_audio_at is not None:
+            trace.mark("first_audio", player.first_audio_at)
+        player.mark()
+        speaking.clear()
+        print("(listening)")
+
+    def tts_worker(player):
+        # Synthesis of the next sentence overlaps playback of the current one.
+        # With speakers, the microphone is muted from the first chunk until nothing more is waiting to be played
+        try:
+            while (text := translations.get()) is not None:
+                _, chunks = tts.stream(text, language=target_language)
+                for chunk in chunks:
+                    if speakers:
+                        mute()
+                    player.write(chunk)
+                if speakers and translations.empty():
+                    unmute(player)
+        finally:
+            player.finish()
+            speaking.clear()
+
+    with Player(tts.samplerate) as player:
+        workers = [
+            threading.Thread(target=traced(capture_segments), args=(segments, stop, samplerate, None, speaking if speakers else None), daemon=True),
+            threading.Thread(target=traced(asr_worker), daemon=True),
+            threading.Thread(target=traced(mt_worker), daemon=True),
+            threading.Thread(target=traced(tts_worker), args=(player,), daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        player.wait()
+
+    if player.first_audio_at is not None:
+        trace.mark("first_audio", player.first_audio_at)
+    return " ".join(transcript), " ".join(translated), trace.time_to_first_audio
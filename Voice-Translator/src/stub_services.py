@@ -0,0 +1,94 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import threading
+import time
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Stand-ins for the three remote APIs the pipeline calls, with fixed
+    latencies so benchmark runs are repeatable and cost nothing:
+    POST /v1/audio/transcriptions                 -> a canned transcript
+    POST /v1/chat/completions                     -> the text, tagged with the target language
+    POST /v1/text-to-speech/<voice>/stream        -> 16-bit PCM silence, streamed in chunks
+    """
+    protocol_version = "HTTP/1.1"
+    transcript = "Good morning, could you tell me where the train station is?"
+    # Seconds; the server's delays attribute (see serve) overrides these
+    delays = {"asr": 0.3, "mt": 0.25, "tts_first_byte": 0.2, "tts_chunk": 0.01}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        # The audio upload is streamed, so it may come chunked instead of with a length
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = bytearray()
+            while (size := int(self.rfile.readline().split(b";")[0], 16)):
+                body += self.rfile.read(size)
+                self.rfile.readline()
+            self.rfile.readline()
+            return bytes(body)
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self._read_body()
+        path = self.path.split("?")[0]
+        if path.endswith("/audio/transcriptions"):
+            time.sleep(self.delays["asr"])
+            self._send(200, self.transcript.encode(), "text/plain; charset=utf-8")
+        elif path.endswith("/chat/completions"):
+            time.sleep(self.delays["mt"])
+            request = json.loads(body)
+            prompt = request["messages"][-1]["content"]
+            language, _, text = prompt.removeprefix("Translate the following text to ").partition(": ")
+            reply = {
+                "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": request["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": f"[{language}] {text}"}}],
+            }
+            self._send(200, json.dumps(reply).encode(), "application/json")
+        elif "/text-to-speech/" in path:
+            self._stream_speech(json.loads(body).get("text", ""))
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def _stream_speech(self, text, samplerate=22050, chunk_ms=100):
+        # Roughly 15 characters per second of speech
+        chunks = max(1, int(len(text) / 15 * 1000 / chunk_ms))
+        chunk = b"\0" * (samplerate * chunk_ms // 1000 * 2)
+        time.sleep(self.delays["tts_first_byte"])
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/basic")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i in range(chunks):
+            if i:
+                time.sleep(self.delays["tts_chunk"])
+            self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+def serve(delays=None, port=0):
+    """
+    Start the stub services on a background thread and point the OpenAI and
+    ElevenLabs clients at them through their environment variables; call
+    this before either client is created. Returns the server (shutdown() to stop).
+    """
+    handler = type("Handler", (StubHandler,), {"delays": {**StubHandler.delays, **(delays or {})}})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.update({
+        "OPENAI_BASE_URL": f"{url}/v1", "OPENAI_API_KEY": "stub",
+        "ELEVENLABS_BASE_URL": url, "ELEVENLABS_API_KEY": "stub",
+    })
+    return server
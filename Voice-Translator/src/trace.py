@@ -0,0 +1,154 @@
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+import uuid
+
+# One JSON file per utterance lands here; set VT_TRACE_DIR="" to turn tracing output off
+trace_dir = os.getenv("VT_TRACE_DIR", "traces")
+
+class Trace:
+    """
+    Timings for one utterance. Stages (capture, encode, upload, asr, mt,
+    tts_first_byte, tts_complete) record when they first started, relative to
+    the trace, and their total seconds and count, since the streaming modes
+    run some stages once per phrase. Marks are single points in time, such
+    as capture_end and first_audio.
+    """
+
+    def __init__(self, utterance_id=None, **meta):
+        self.id = utterance_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.meta = meta
+        self.started_at = time.time()
+        self._origin = time.monotonic()
+        self.stages = {}
+        self.marks = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, start, end):
+        """
+        Record a stage that ran between two time.monotonic() readings.
+        """
+        with self._lock:
+            entry = self.stages.setdefault(name, {"start": round(start - self._origin, 4), "seconds": 0.0, "count": 0})
+            entry["seconds"] = round(entry["seconds"] + end - start, 4)
+            entry["count"] += 1
+
+    @contextmanager
+    def stage(self, name):
+        start = time.monotonic()
+        try:
+            yield self
+        finally:
+            self.add(name, start, time.monotonic())
+
+    def mark(self, name, at=None):
+        """
+        Record a point in time (time.monotonic(), default now); only the first mark of a name is kept.
+        """
+        with self._lock:
+            self.marks.setdefault(name, round((at if at is not None else time.monotonic()) - self._origin, 4))
+
+    @property
+    def time_to_first_audio(self):
+        """
+        Seconds from the end of capture (or the start of the trace) to the first translated audio.
+        """
+        if "first_audio" not in self.marks:
+            return None
+        return round(self.marks["first_audio"] - self.marks.get("capture_end", 0.0), 4)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "id": self.id,
+                "started_at": self.started_at,
+                "time_to_first_audio": self.time_to_first_audio,
+                "stages": {name: dict(entry) for name, entry in self.stages.items()},
+                "marks": dict(self.marks),
+                "meta": self.meta,
+            }
+
+    def write(self, directory=None):
+        directory = trace_dir if directory is None else directory
+        if not directory:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        return path
+
+# The trace being recorded on this thread, so stage timers deep in the
+# pipeline need no extra arguments. Worker threads activate it themselves.
+_local = threading.local()
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+@contextmanager
+def activate(trace):
+    previous = current_trace()
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+@contextmanager
+def stage(name):
+    """
+    Time a stage on the current thread's trace; does nothing without one.
+    """
+    trace = current_trace()
+    if trace is None:
+        yield None
+        return
+    with trace.stage(name):
+        yield trace
+
+def mark(name, at=None):
+    trace = current_trace()
+    if trace is not None:
+        trace.mark(name, at)
+
+def traced_chunks(chunks):
+    """
+    Wrap a TTS chunk iterator to record tts_first_byte and tts_complete,
+    both timed from this call, on the current thread's trace.
+    """
+    trace = current_trace()
+    if trace is None:
+        return chunks
+    start = time.monotonic()
+
+    def timed():
+        first = True
+        for chunk in chunks:
+            if first:
+                trace.add("tts_first_byte", start, time.monotonic())
+                first = False
+            yield chunk
+        trace.add("tts_complete", start, time.monotonic())
+
+    return timed()
+
+# Pipeline order, for printing; stages not in here are listed after these
+stage_order = ("capture", "encode", "upload", "asr", "mt", "tts_first_byte", "tts_complete")
+
+def format_trace(trace):
+    """
+    One line per trace, e.g. "capture 2.41s | encode 0.01s | ... | first audio 1.32s".
+    """
+    stages = trace.to_dict()["stages"]
+    names = [name for name in stage_order if name in stages] + [name for name in stages if name not in stage_order]
+    parts = []
+    for name in names:
+        part = f"{name} {stages[name]['seconds']:.2f}s"
+        if stages[name]["count"] > 1:
+            part += f" (x{stages[name]['count']})"
+        parts.append(part)
+    if trace.time_to_first_audio is not None:
+        parts.append(f"first audio {trace.time_to_first_audio:.2f}s")
+    return " | ".join(parts)
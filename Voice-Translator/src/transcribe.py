@@ -1,12 +1,52 @@
-from openai import OpenAI
+import io
+import time
+
+from src.audio import encode_audio
+from src.clients import openai_client
+from src.trace import current_trace, stage
 
 def transcribe_audio(file_path):
-    client = OpenAI()
     with open(file_path, "rb") as audio_file:
-        transcription = client.audio.transcriptions.create(
+        transcription = openai_client().audio.transcriptions.create(
             model="gpt-4o-transcribe", 
             file=audio_file, 
             response_format="text"
         )
     print(transcription)
-    return transcription
\ No newline at end of file
+    return transcription
+
+class _UploadBody(io.BytesIO):
+    """
+    The request body as a file, so the HTTP client streams it in chunks and
+    the trace can see when the last one was sent (the read that hits EOF).
+    """
+
+    def __init__(self, data, trace):
+        super().__init__(data)
+        self._trace = trace
+        self._started = None
+
+    def read(self, size=-1):
+        if self._started is None:
+            self._started = time.monotonic()
+        data = super().read(size)
+        if not data and self._trace is not None:
+            self._trace.add("upload", self._started, time.monotonic())
+            self._trace = None  # A retry re-reads the body; keep the first upload
+        return data
+
+def transcribe_pcm(samples, samplerate, audio_format="wav"):
+    """
+    Transcribe an int16 numpy buffer straight from memory, without a temp file.
+    The asr stage covers the whole request, upload included.
+    """
+    with stage("encode"):
+        name, data, mime = encode_audio(samples, samplerate, audio_format)
+    with stage("asr"):
+        transcription = openai_client().audio.transcriptions.create(
+            model="gpt-4o-transcribe",
+            file=(name, _UploadBody(data, current_trace()), mime),
+            response_format="text"
+        )
+    print(transcription)
+    return transcription
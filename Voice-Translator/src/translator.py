@@ -1,8 +1,15 @@
-from openai import OpenAI
-client = OpenAI()
+import json
+from src.clients import openai_client
+from src.memory import get_memory
 
-def translator(text, target_language):
-    response = client.chat.completions.create(
+def translator(text, target_language, use_memory=True):
+    # Repeated greetings and instructions are served from the translation memory without an API call
+    memory = get_memory() if use_memory else None
+    if memory is not None:
+        cached = memory.get(text, target_language, fuzzy=True)
+        if cached is not None:
+            return cached
+    response = openai_client().chat.completions.create(
         model="gpt-4o",
         messages=[
             {"role": "system", "content": "You are a translation assistant. Only translate the text, do not include any additional information."},
@@ -10,4 +17,98 @@ def translator(text, target_language):
         ]
     )
     translated_text = response.choices[0].message.content.strip()
-    return translated_text
\ No newline at end of file
+    if memory is not None:
+        memory.put(text, target_language, translated_text)
+    return translated_text
+
+def translate_batch(texts, target_language, use_memory=True):
+    """
+    Translate several short texts in one request. Falls back to one request
+    per text if the reply doesn't have exactly one translation per input.
+    """
+    memory = get_memory() if use_memory else None
+    results = [memory.get(text, target_language, fuzzy=True) if memory is not None else None for text in texts]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if len(missing) == 1:
+        results[missing[0]] = translator(texts[missing[0]], target_language, use_memory)
+        missing = []
+    if missing:
+        response = openai_client().chat.completions.create(
+            model="gpt-4o",
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": "You are a translation assistant. Only translate the text, do not include any additional information. "
+                                              'Reply with a JSON object {"translations": [...]} holding one translation per input string, in the same order.'},
+                {"role": "user", "content": f"Translate each string in this JSON array to {target_language}: "
+                                            + json.dumps([texts[i] for i in missing], ensure_ascii=False)}
+            ]
+        )
+        try:
+            translations = json.loads(response.choices[0].message.content)["translations"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            translations = None
+        if not isinstance(translations, list) or len(translations) != len(missing):
+            translations = [translator(texts[i], target_language, use_memory=False) for i in missing]
+        for i, translated_text in zip(missing, translations):
+            results[i] = str(translated_text).strip()
+            if memory is not None:
+                memory.put(texts[i], target_language, results[i])
+    return results
+
+def detect_language(text, languages):
+    """
+    Which of languages text is written in, or None if the reply names none of them.
+    """
+    response = openai_client().chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": f"Which of these languages is the text written in: {', '.join(languages)}? Reply with the language name only."},
+            {"role": "user", "content": text}
+        ]
+    )
+    answer = response.choices[0].message.content.strip().strip(".").lower()
+    return next((language for language in languages if language.lower() == answer), None)
+
+def translate_between(text, language_a, language_b, use_memory=True, last_target=None):
+    """
+    For a two-way conversation: work out which of the two languages text is
+    in and translate it into the other, in one request.
+    last_target is the language the previous utterance was translated into;
+    it is only used when the spoken language can't be identified.
+    Returns (target language, translation).
+    """
+    memory = get_memory() if use_memory else None
+    if memory is not None:
+        # Exact matches only: a loose hit could come from the other speaker's language
+        for target_language in (language_b, language_a):
+            cached = memory.get(text, target_language, fuzzy=False)
+            if cached is not None:
+                return target_language, cached
+    response = openai_client().chat.completions.create(
+        model="gpt-4o",
+        response_format={"type": "json_object"},
+        messages=[
+            {"role": "system", "content": f"You are an interpreter between a {language_a} speaker and a {language_b} speaker. "
+                                          f"If the text is in {language_a}, translate it to {language_b}; otherwise translate it to {language_a}. "
+                                          "Only translate the text, do not include any additional information. "
+                                          'Reply with a JSON object {"target": "<language you translated to>", "translation": "<translated text>"}.'},
+            {"role": "user", "content": text}
+        ]
+    )
+    try:
+        reply = json.loads(response.choices[0].message.content)
+        target_language, translated_text = str(reply["target"]).strip(), str(reply["translation"]).strip()
+    except (json.JSONDecodeError, KeyError, TypeError):
+        target_language, translated_text = None, None
+    if target_language is None or target_language.lower() not in (language_a.lower(), language_b.lower()):
+        # Unusable reply: identify the spoken language on its own, and failing
+        # that assume the last listener is now answering in their language
+        source_language = detect_language(text, (language_a, language_b))
+        if source_language is None:
+            source_language = last_target or language_a
+        target_language = language_b if source_language == language_a else language_a
+        translated_text = translator(text, target_language, use_memory=False)
+    target_language = language_a if target_language.lower() == language_a.lower() else language_b
+    if memory is not None:
+        memory.put(text, target_language, translated_text)
+    return target_language, translated_text
@@ -2,23 +2,86 @@ from dotenv import load_dotenv
 from elevenlabs.client import ElevenLabs
 from elevenlabs import play
 import os
+from src.memory import get_memory
+from src.playback import play_stream
 
 load_dotenv()
 
 elevenlabs = ElevenLabs(
   api_key=os.getenv("ELEVENLABS_API_KEY"),
+  base_url=os.getenv("ELEVENLABS_BASE_URL"),  # None is the production API; the benchmark's stub services set it
 )
 
-def voice(text: str):
-    audio_gen = elevenlabs.text_to_speech.convert(
+voice_id = "JBFqnCBsd6RMkjVDRZzb"
+model_id = "eleven_multilingual_v2"
+# Raw 16-bit mono PCM can be written to the sound card as it arrives, no decoding needed
+pcm_samplerate = 22050
+
+cached_chunk_size = 4096
+
+def cached_audio(text: str, output_format: str, synthesize):
+    """
+    Yield audio for text from the TTS cache, or from synthesize() while
+    storing it, so repeated phrases are never synthesised twice.
+    """
+    memory = get_memory()
+    key = memory.audio_key(text, voice_id, model_id, output_format)
+    data = memory.get_audio(key)
+    if data is not None:
+        for i in range(0, len(data), cached_chunk_size):
+            yield data[i:i + cached_chunk_size]
+        return
+    chunks = []
+    for chunk in synthesize():
+        chunks.append(chunk)
+        yield chunk
+    # Only complete syntheses are cached
+    memory.put_audio(key, b"".join(chunks))
+
+mp3_format = "mp3_44100_128"
+
+def stream_tts(text: str, output_format: str = mp3_format):
+    """
+    Yield audio chunks for text in any ElevenLabs output format as they are generated.
+    """
+    return cached_audio(text, output_format, lambda: elevenlabs.text_to_speech.stream(
+        voice_id=voice_id,
         text=text,
-        voice_id="JBFqnCBsd6RMkjVDRZzb",
-        model_id="eleven_multilingual_v2",
-        output_format="mp3_44100_128",
-    )
-    # Save audio to file
-    with open("output_audio.wav", "wb") as f:
-        for chunk in audio_gen:
-            f.write(chunk)
-    # play(audio)
-    
\ No newline at end of file
+        model_id=model_id,
+        output_format=output_format,
+    ))
+
+def synthesize(text: str, output_format: str = mp3_format):
+    """
+    The complete audio for text as bytes, for writing to a file.
+    """
+    return b"".join(stream_tts(text, output_format))
+
+def voice(text: str, save_path: str | None = None, player=None):
+    """
+    Play text as MP3 while it streams in, and return the playback stats
+    (time_to_first_audio, underruns, seconds). The audio is MP3, so a
+    save_path should end in .mp3.
+    """
+    audio_gen = stream_tts(text, mp3_format)
+    if save_path is None:
+        return play_stream(audio_gen, mp3_format, player)
+    with open(save_path, "wb") as f:
+        def saved():
+            for chunk in audio_gen:
+                f.write(chunk)
+                yield chunk
+        return play_stream(saved(), mp3_format, player)
+
+def stream_voice(text: str, samplerate: int = pcm_samplerate):
+    """
+    Yield raw 16-bit mono PCM chunks as ElevenLabs generates them.
+    """
+    return stream_tts(text, f"pcm_{samplerate}")
+
+def speak(text: str, samplerate: int = pcm_samplerate, player=None):
+    """
+    Play text as raw PCM while it streams in, without writing a file or
+    decoding. Returns the playback stats like voice().
+    """
+    return play_stream(stream_voice(text, samplerate), f"pcm_{samplerate}", player)
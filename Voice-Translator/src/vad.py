@@ -0,0 +1,121 @@
+from collections import deque
+import time
+
+import numpy as np
+import sounddevice as sd
+
+from src.trace import current_trace
+
+try:
+    import webrtcvad
+except ImportError:  # Optional; the energy detector is used without it
+    webrtcvad = None
+
+samplerate = 16000
+channels = 1
+frame_ms = 30            # WebRTC VAD accepts 10, 20 or 30 ms frames
+preroll_ms = 300         # audio kept from before speech onset so the first syllable isn't clipped
+end_silence_ms = 800     # trailing silence that ends the utterance
+trim_padding_ms = 100    # silence left around the speech after trimming
+min_speech_ms = 150      # shorter bursts (clicks, bumps) don't start an utterance
+max_duration_s = 30
+
+class VoiceActivityDetector:
+    """
+    Frame-level speech detector. Uses WebRTC VAD when the webrtcvad package is
+    installed, otherwise an energy threshold that adapts to the noise floor
+    measured on the first frames.
+    """
+
+    def __init__(self, samplerate=samplerate, aggressiveness=2, min_rms=300, noise_ratio=3.0, calibration_frames=10, use_webrtc=True):
+        self.samplerate = samplerate
+        self.min_rms = min_rms
+        self.noise_ratio = noise_ratio
+        self.calibration_frames = calibration_frames
+        self._noise = []
+        self._webrtc = webrtcvad.Vad(aggressiveness) if use_webrtc and webrtcvad is not None else None
+
+    @property
+    def threshold(self):
+        if not self._noise:
+            return self.min_rms
+        return max(self.min_rms, float(np.median(self._noise)) * self.noise_ratio)
+
+    def is_speech(self, frame):
+        if self._webrtc is not None:
+            return self._webrtc.is_speech(frame.tobytes(), self.samplerate)
+        rms = float(np.sqrt(np.mean(frame.astype(np.float32) ** 2)))
+        if len(self._noise) < self.calibration_frames:
+            # Assume the speaker hasn't started in the first few frames
+            self._noise.append(rms)
+            return False
+        return rms >= self.threshold
+
+def trim_silence(samples, detector=None, samplerate=samplerate, padding_ms=trim_padding_ms):
+    """
+    Cut leading and trailing non-speech frames, keeping padding_ms around the speech.
+    """
+    detector = detector or VoiceActivityDetector(samplerate, calibration_frames=0)
+    frame_len = int(samplerate * frame_ms / 1000)
+    voiced = [
+        i for i in range(0, len(samples) - frame_len + 1, frame_len)
+        if detector.is_speech(samples[i:i + frame_len])
+    ]
+    if not voiced:
+        return samples[:0]
+    padding = int(samplerate * padding_ms / 1000)
+    return samples[max(0, voiced[0] - padding):min(len(samples), voiced[-1] + frame_len + padding)]
+
+def record_utterance(samplerate=samplerate, end_silence_ms=end_silence_ms, max_duration_s=max_duration_s, detector=None, stream=None, mute=None, stop=None):
+    """
+    Record from the microphone until the speaker stops, and return the speech
+    as an int16 array trimmed of leading and trailing silence (empty if
+    nobody spoke before max_duration_s).
+    Frames before speech onset live in a ring buffer of preroll_ms.
+    Pass an open InputStream as stream to avoid reopening the device per utterance.
+    While the mute event is set, frames count as silence (so translated speech
+    coming out of the speakers isn't recorded); setting stop returns early.
+    """
+    detector = detector or VoiceActivityDetector(samplerate)
+    frame_len = int(samplerate * frame_ms / 1000)
+    preroll = deque(maxlen=preroll_ms // frame_ms)
+    speech, voiced_ms, silent_ms = [], 0, 0
+    started = onset = time.monotonic()
+
+    own_stream = stream is None
+    if own_stream:
+        stream = sd.InputStream(samplerate=samplerate, channels=channels, dtype="int16", blocksize=frame_len)
+        stream.start()
+    try:
+        while time.monotonic() - started < max_duration_s and not (stop is not None and stop.is_set()):
+            frame, _ = stream.read(frame_len)
+            frame = frame[:, 0].copy()
+            if mute is not None and mute.is_set():
+                frame[:] = 0
+                is_speech = False
+            else:
+                is_speech = detector.is_speech(frame)
+            if not speech:
+                preroll.append(frame)
+                voiced_ms = voiced_ms + frame_ms if is_speech else 0
+                if voiced_ms >= min_speech_ms:
+                    speech = list(preroll)
+                    onset = time.monotonic() - voiced_ms / 1000
+                continue
+            speech.append(frame)
+            silent_ms = 0 if is_speech else silent_ms + frame_ms
+            if silent_ms >= end_silence_ms:
+                break
+    finally:
+        if own_stream:
+            stream.stop()
+            stream.close()
+
+    trace = current_trace()
+    if trace is not None and speech:
+        # Capture runs from speech onset until the trailing silence closed the utterance
+        trace.add("capture", onset, time.monotonic())
+        trace.mark("capture_end")
+    if not speech:
+        return np.zeros(0, dtype=np.int16)
+    return trim_silence(np.concatenate(speech), detector, samplerate)
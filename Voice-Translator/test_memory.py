@@ -0,0 +1,30 @@
+import unittest
+
+from src.memory import TranslationMemory
+
+
+class TestTranslationMemory(unittest.TestCase):
+    def setUp(self):
+        self.memory = TranslationMemory(":memory:")
+        self.memory.put("The store is open.", "French", "Le magasin est ouvert.")
+        self.memory.put("Turn left at the station", "French", "Tournez à gauche à la gare")
+        self.memory.put("Gate 12.5, please", "French", "Porte 12.5, s'il vous plaît")
+
+    def tearDown(self):
+        self.memory.close()
+
+    def test_exact_lookup_ignores_case_and_spacing(self):
+        self.assertEqual(self.memory.get("  the store  IS open", "french"), "Le magasin est ouvert.")
+
+    def test_fuzzy_is_opt_in(self):
+        self.assertIsNone(self.memory.get("Turn left, at the station", "French"))
+        self.assertEqual(self.memory.get("Turn left, at the station", "French", fuzzy=True), "Tournez à gauche à la gare")
+
+    def test_fuzzy_never_changes_the_meaning(self):
+        self.assertIsNone(self.memory.get("The store is not open.", "French", fuzzy=True))
+        self.assertIsNone(self.memory.get("Turn right at the station", "French", fuzzy=True))
+        self.assertIsNone(self.memory.get("Gate 125, please", "French", fuzzy=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
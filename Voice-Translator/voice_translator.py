@@ -1,49 +1,144 @@
 import sounddevice as sd
-import tempfile
-import os
-from src.tts import voice as tts_voice
-from src.translator import translator
-from src.transcribe import transcribe_audio
+import sys
+from src.audio import encode_wav
+from src.batch import language_slug
+from src.backends import get_asr, get_mt, get_tts
+from src.fanout import fan_out_speech
+from src.interpreter import interpret
+from src.playback import parse_output_format, play_stream
+from src.streaming import stream_translate
+from src.trace import Trace, activate, format_trace, mark, stage
+import wave
+from src.vad import record_utterance
 
 samplerate = 16000
 channels = 1
-duration = 5  # seconds to record
+duration = None  # seconds to record; None records until you stop speaking
 
-def record_audio(filename, duration=duration, samplerate=samplerate, channels=channels):
+def record_samples(duration=duration, samplerate=samplerate, channels=channels):
+    """
+    Record into an int16 numpy buffer.
+    """
+    if duration is None:
+        print("Listening... (stops when you stop speaking)")
+        return record_utterance(samplerate)
     print(f"Recording for {duration} seconds...")
-    audio = sd.rec(int(duration * samplerate), samplerate=samplerate, channels=channels, dtype='int16')
-    sd.wait()
+    with stage("capture"):
+        audio = sd.rec(int(duration * samplerate), samplerate=samplerate, channels=channels, dtype='int16')
+        sd.wait()
+    mark("capture_end")
+    return audio
+
+def record_audio(filename, duration=duration, samplerate=samplerate, channels=channels):
+    audio = record_samples(duration, samplerate, channels)
     # Save as WAV
-    import wave
-    with wave.open(filename, 'wb') as wf:
-        wf.setnchannels(channels)
-        wf.setsampwidth(2)  # 16 bits
-        wf.setframerate(samplerate)
-        wf.writeframes(audio.tobytes())
+    with open(filename, 'wb') as f:
+        f.write(encode_wav(audio, samplerate, channels))
     print(f"Audio saved to {filename}")
 
 
+def translate_to_many(languages):
+    """
+    Record once and write each language's speech to output_<language>.mp3
+    (.wav with a local TTS backend) as its audio streams in. Returns {language: seconds to its first audio}.
+    """
+    trace = Trace(mode="fan-out", languages=languages)
+    with activate(trace):
+        audio = record_samples()
+    if not len(audio):
+        print("No speech detected")
+        return {}
+    files, first_audio = {}, {}
+    # fan_out runs on this thread between events, so it sees the trace and passes it to its workers
+    with activate(trace):
+        try:
+            for event in fan_out_speech(audio, samplerate, languages):
+                if event["type"] == "transcript":
+                    print(f"Transcribed: {event['text']}")
+                elif event["type"] == "translation":
+                    print(f"{event['language']}: {event['text']}")
+                elif event["type"] == "audio":
+                    trace.mark("first_audio")
+                    if event["language"] not in files:
+                        codec, rate = parse_output_format(event["format"])
+                        path = f"output_{language_slug(event['language'])}"
+                        if codec == "pcm":
+                            # Local TTS produces raw PCM; wave fills in the header lengths on close
+                            files[event["language"]] = wave.open(path + ".wav", "wb")
+                            files[event["language"]].setnchannels(1)
+                            files[event["language"]].setsampwidth(2)
+                            files[event["language"]].setframerate(rate)
+                        else:
+                            files[event["language"]] = open(f"{path}.{codec}", "wb")
+                    if isinstance(files[event["language"]], wave.Wave_write):
+                        files[event["language"]].writeframes(event["data"])
+                    else:
+                        files[event["language"]].write(event["data"])
+                elif event["type"] == "done" and event["language"] in files:
+                    files.pop(event["language"]).close()
+                    first_audio[event["language"]] = event["first_audio"]
+                    print(f"{event['language']} audio ready (first audio after {event['first_audio']:.2f}s)")
+                elif event["type"] == "error":
+                    print(f"{event['language']} failed: {event['error']}")
+        finally:
+            for f in files.values():
+                f.close()
+    print(format_trace(trace))
+    trace.write()
+    return first_audio
+
+
 if __name__ == "__main__":
+    if "--to" in sys.argv:
+        # Fan-out mode: one speaker, several target languages at once
+        languages = [language.strip() for language in sys.argv[sys.argv.index("--to") + 1].split(",") if language.strip()]
+        translate_to_many(languages)
+        sys.exit(0)
+
+    if "--interpret" in sys.argv:
+        # Interpreter mode: a two-way conversation that keeps running until Ctrl+C
+        language_a, language_b = [language.strip() for language in sys.argv[sys.argv.index("--interpret") + 1].split(",")]
+        print(f"Interpreting between {language_a} and {language_b}. Speak in turn; Ctrl+C to stop.")
+        stats = interpret(language_a, language_b)
+        print(f"{stats['utterances']} utterances translated ({stats['dropped']} dropped while behind)")
+        sys.exit(0)
+
     target_language = input("Enter target language (e.g., French, Spanish): ")
-    
-    # Step 1: Record audio
-    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmpfile:
-        audio_path = tmpfile.name
-    record_audio(audio_path)
-
-    # Step 2: Transcribe
-    print("Transcribing...")
-    text = transcribe_audio(audio_path)
-    print(f"Transcribed: {text}")
-
-    # Step 3: Translate
-    translated_text = translator(text, target_language)
-    print(f"Translated: {translated_text}")
-
-    # Step 4: TTS
-    print("Synthesizing speech...")
-    tts_voice(translated_text)
-    print("Audio output saved as output_audio.wav")
-
-    # Cleanup
-    os.remove(audio_path)
+
+    if "--stream" in sys.argv:
+        # Pipelined mode: speak, and hear each translated sentence as soon as it is ready
+        print("Listening... (stops after a pause of a second and a half)")
+        trace = Trace(mode="stream", target_language=target_language)
+        text, translated_text, first_audio = stream_translate(target_language, trace=trace, speakers="--speakers" in sys.argv)
+        print(f"Transcribed: {text}")
+        print(format_trace(trace))
+        if (path := trace.write()) is not None:
+            print(f"Trace written to {path}")
+        sys.exit(0)
+
+    # Every stage below is timed into a JSON trace for this utterance
+    trace = Trace(mode="single", target_language=target_language)
+    with activate(trace):
+        # Step 1: Record audio (kept in memory, never written to disk)
+        audio = record_samples()
+        if not len(audio):
+            print("No speech detected")
+            sys.exit(0)
+
+        # Step 2: Transcribe
+        print("Transcribing...")
+        text = get_asr().transcribe(audio, samplerate)
+        print(f"Transcribed: {text}")
+
+        # Step 3: Translate
+        translated_text = get_mt().translate(text, target_language)
+        print(f"Translated: {translated_text}")
+
+        # Step 4: TTS, played as it streams in
+        print("Speaking...")
+        output_format, chunks = get_tts().stream(translated_text, language=target_language)
+        play_stream(chunks, output_format)
+
+    print(format_trace(trace))
+    if (path := trace.write()) is not None:
+        print(f"Trace written to {path}")